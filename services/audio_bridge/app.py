@@ -19,7 +19,7 @@ import paho.mqtt.client as mqtt
 from fastapi import FastAPI
 from pydantic import BaseModel
 
-from audio_capture import AudioCapture
+from audio_capture import AudioCapture, CapturedChunk
 from whisper_client import WhisperClient
 from mqtt_publisher import MQTTPublisher
 
@@ -41,6 +41,7 @@ AUDIO_DEVICE_INDEX = int(os.getenv('AUDIO_DEVICE_INDEX', '0'))
 AUDIO_SAMPLE_RATE = int(os.getenv('AUDIO_SAMPLE_RATE', '16000'))
 AUDIO_CHUNK_DURATION_MS = int(os.getenv('AUDIO_CHUNK_DURATION_MS', '3000'))
 AUDIO_SILENCE_THRESHOLD = int(os.getenv('AUDIO_SILENCE_THRESHOLD', '500'))
+AUDIO_REALTIME_PRIORITY = os.getenv('AUDIO_REALTIME_PRIORITY', 'false').lower() == 'true'
 
 class HealthResponse(BaseModel):
     status: str
@@ -116,7 +117,8 @@ class AudioBridgeService:
                 device_index=AUDIO_DEVICE_INDEX,
                 sample_rate=AUDIO_SAMPLE_RATE,
                 chunk_duration_ms=AUDIO_CHUNK_DURATION_MS,
-                silence_threshold=AUDIO_SILENCE_THRESHOLD
+                silence_threshold=AUDIO_SILENCE_THRESHOLD,
+                realtime_priority=AUDIO_REALTIME_PRIORITY
             )
             
             logger.info("All components initialized successfully")
@@ -126,19 +128,19 @@ class AudioBridgeService:
             logger.error(f"Failed to initialize components: {e}")
             return False
     
-    async def process_audio_chunk(self, audio_data: bytes, duration_ms: int):
+    async def process_audio_chunk(self, chunk: CapturedChunk):
         """Process a captured audio chunk"""
         try:
             # Send to Whisper for transcription
             if self.whisper_client and self.whisper_client.is_connected():
-                transcript = await self.whisper_client.transcribe(audio_data)
+                transcript = await self.whisper_client.transcribe(chunk.audio_data)
                 
                 if transcript and transcript.strip():
                     # Publish transcript to MQTT
                     await self.mqtt_publisher.publish_transcript(
                         text=transcript,
                         confidence=0.95,  # TODO: Get actual confidence from Whisper
-                        duration_ms=duration_ms,
+                        duration_ms=chunk.duration_ms,
                         model=WHISPER_MODEL,
                         trigger="continuous"
                     )
@@ -158,11 +160,11 @@ class AudioBridgeService:
         while self.running:
             try:
                 # Capture audio chunk
-                audio_data, duration_ms = await self.audio_capture.capture_chunk()
+                chunk = await self.audio_capture.capture_chunk()
                 
-                if audio_data:
+                if chunk:
                     # Process asynchronously
-                    asyncio.create_task(self.process_audio_chunk(audio_data, duration_ms))
+                    asyncio.create_task(self.process_audio_chunk(chunk))
                 else:
                     logger.debug("No audio data captured")
                 
@@ -204,6 +206,9 @@ class AudioBridgeService:
         if self.audio_capture:
             await self.audio_capture.stop()
         
+        if self.whisper_client:
+            await self.whisper_client.close()
+        
         if self.mqtt_publisher:
             await self.mqtt_publisher.disconnect()
         
@@ -6,37 +6,120 @@ Designed to work with MacBook lid closed.
 """
 
 import asyncio
+import io
 import logging
+import os
 import time
 import wave
-from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
 
 import numpy as np
 import pyaudio
 
 logger = logging.getLogger(__name__)
 
+# Band edges for audio features (match the node firmware's filter bank)
+LOW_BAND_HZ = 300
+HIGH_BAND_HZ = 3000
+
+# Sample value of a full-scale int16 signal; features are reported relative to it
+INT16_FULL_SCALE = 32768.0
+
+# Feature names in analyze_chunk() order, as defined by schemas/audio_features.json
+FEATURE_NAMES = ("rms", "zcr", "low", "mid", "high")
+
+
+def analyze_chunk(
+    audio_array: np.ndarray, sample_rate: int
+) -> Tuple[float, float, float, float, float]:
+    """Compute RMS, ZCR and low/mid/high band levels from one float buffer and one FFT
+
+    Levels are relative to int16 full scale, so all five features lie in [0, 1] like the
+    node firmware's (which normalizes its 24-bit samples the same way).
+    """
+    n = audio_array.size
+    if n == 0:
+        return 0.0, 0.0, 0.0, 0.0, 0.0
+
+    samples = audio_array.astype(np.float32) / INT16_FULL_SCALE
+    rms = float(np.sqrt(np.dot(samples, samples) / n))
+
+    signs = np.signbit(audio_array)
+    zcr = float(np.count_nonzero(signs[1:] != signs[:-1]) / n)
+
+    # One-sided power spectrum scaled so band powers sum to the mean square; DC and
+    # (for even n) Nyquist have no mirrored bin, so they are not doubled
+    power = np.abs(np.fft.rfft(samples)) ** 2 * (2.0 / (n * n))
+    power[0] /= 2
+    if n % 2 == 0:
+        power[-1] /= 2
+    low_bin = int(LOW_BAND_HZ * n / sample_rate)
+    high_bin = int(HIGH_BAND_HZ * n / sample_rate)
+    low = float(np.sqrt(power[:low_bin].sum()))
+    mid = float(np.sqrt(power[low_bin:high_bin].sum()))
+    high = float(np.sqrt(power[high_bin:].sum()))
+
+    return rms, zcr, low, mid, high
+
+
+def _boost_thread_priority(priority: int = 20) -> bool:
+    """Move the calling thread to SCHED_FIFO so capture reads are not preempted"""
+    if not hasattr(os, "sched_setscheduler"):
+        logger.info("Real-time scheduling not supported on this platform")
+        return False
+    
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+        logger.info(f"Audio capture thread running with SCHED_FIFO priority {priority}")
+        return True
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not raise audio capture thread priority: {e}")
+        return False
+
+
+@dataclass
+class CapturedChunk:
+    """A non-silent audio chunk with the values computed while capturing it"""
+    audio_data: bytes
+    audio_array: np.ndarray
+    rms: float
+    duration_ms: int
+
+
 class AudioCapture:
     def __init__(
         self,
         device_index: int = 0,
         sample_rate: int = 16000,
         chunk_duration_ms: int = 3000,
-        silence_threshold: int = 500
+        silence_threshold: int = 500,
+        realtime_priority: bool = False
     ):
         self.device_index = device_index
         self.sample_rate = sample_rate
         self.chunk_duration_ms = chunk_duration_ms
         self.silence_threshold = silence_threshold
+        self.realtime_priority = realtime_priority
+        
+        # With real-time priority, blocking reads run on one dedicated thread
+        # that is boosted once, leaving the event loop thread's policy alone
+        self._read_executor: Optional[ThreadPoolExecutor] = None
         
         # Calculate chunk size
         self.chunk_size = int(sample_rate * chunk_duration_ms / 1000)
+        self._chunk_bytes = self.chunk_size * 2  # 2 bytes per sample
+        self._chunk_duration_ms = self.chunk_size * 1000 // sample_rate
         
         # PyAudio instance
         self.pyaudio_instance: Optional[pyaudio.PyAudio] = None
         self.stream: Optional[pyaudio.Stream] = None
         self.capturing = False
         
+        # Reusable buffer for WAV encoding
+        self._wav_buf = io.BytesIO()
+        
         logger.info(f"Audio capture initialized: device={device_index}, rate={sample_rate}, chunk={chunk_duration_ms}ms")
     
     def list_audio_devices(self) -> list:
@@ -89,6 +172,13 @@ class AudioCapture:
                 stream_callback=None  # We'll use blocking reads
             )
             
+            if self.realtime_priority and not self._read_executor:
+                self._read_executor = ThreadPoolExecutor(
+                    max_workers=1,
+                    thread_name_prefix="audio-capture",
+                    initializer=_boost_thread_priority
+                )
+            
             self.capturing = True
             logger.info("Audio capture started")
             
@@ -98,8 +188,18 @@ class AudioCapture:
     
     async def stop(self):
         """Stop audio capture"""
+        self.close()
+        logger.info("Audio capture stopped")
+    
+    def close(self):
+        """Release the PyAudio stream and instance synchronously"""
         self.capturing = False
         
+        # Let an in-flight read finish before the stream is closed under it
+        if self._read_executor:
+            self._read_executor.shutdown(wait=True)
+            self._read_executor = None
+        
         if self.stream:
             self.stream.stop_stream()
             self.stream.close()
@@ -108,47 +208,73 @@ class AudioCapture:
         if self.pyaudio_instance:
             self.pyaudio_instance.terminate()
             self.pyaudio_instance = None
-        
-        logger.info("Audio capture stopped")
     
     def is_capturing(self) -> bool:
         """Check if audio capture is active"""
         return self.capturing and self.stream is not None
     
-    async def capture_chunk(self) -> Tuple[Optional[bytes], int]:
+    async def capture_chunk(self) -> Optional[CapturedChunk]:
         """Capture a chunk of audio data"""
         if not self.is_capturing():
-            return None, 0
+            return None
         
         try:
-            # Read audio data
-            audio_data = self.stream.read(self.chunk_size, exception_on_overflow=False)
+            # Read audio data, on the boosted capture thread if there is one
+            if self._read_executor:
+                loop = asyncio.get_running_loop()
+                audio_data = await loop.run_in_executor(self._read_executor, self._read_stream)
+            else:
+                audio_data = self._read_stream()
             
             # Convert to numpy array for analysis
             audio_array = np.frombuffer(audio_data, dtype=np.int16)
-            
+
+            # Cheap silence pre-check: a peak below threshold implies RMS below it.
+            # max/min avoid np.abs, which overflows on -32768 and allocates a copy.
+            peak = max(int(audio_array.max()), -int(audio_array.min()))
+            if peak < self.silence_threshold:
+                logger.debug(f"Silent chunk detected (peak: {peak})")
+                return None
+
             # Check for silence
-            rms = np.sqrt(np.mean(audio_array**2))
+            samples = audio_array.astype(np.float32)
+            rms = float(np.sqrt(np.dot(samples, samples) / samples.size))
             if rms < self.silence_threshold:
                 logger.debug(f"Silent chunk detected (RMS: {rms})")
-                return None, 0
+                return None
             
-            # Calculate actual duration
-            duration_ms = int(len(audio_data) / (self.sample_rate * 2) * 1000)  # 2 bytes per sample
+            # Reads are fixed-size; only a short read needs its duration computed
+            if len(audio_data) == self._chunk_bytes:
+                duration_ms = self._chunk_duration_ms
+            else:
+                duration_ms = audio_array.size * 1000 // self.sample_rate
             
             logger.debug(f"Captured audio chunk: {len(audio_data)} bytes, RMS: {rms:.1f}, duration: {duration_ms}ms")
             
-            return audio_data, duration_ms
+            return CapturedChunk(
+                audio_data=audio_data,
+                audio_array=audio_array,
+                rms=rms,
+                duration_ms=duration_ms
+            )
             
         except Exception as e:
             logger.error(f"Error capturing audio chunk: {e}")
-            return None, 0
+            return None
+    
+    def _read_stream(self) -> bytes:
+        """Blocking read of one chunk from the input stream"""
+        return self.stream.read(self.chunk_size, exception_on_overflow=False)
+    
+    def analyze(self, audio_array: np.ndarray) -> Dict[str, float]:
+        """Get audio features for a captured chunk, keyed by feature name"""
+        return dict(zip(FEATURE_NAMES, analyze_chunk(audio_array, self.sample_rate)))
     
     def create_wav_data(self, audio_data: bytes) -> bytes:
         """Convert raw audio data to WAV format"""
-        import io
-        
-        wav_buffer = io.BytesIO()
+        wav_buffer = self._wav_buf
+        wav_buffer.seek(0)
+        wav_buffer.truncate(0)
         
         with wave.open(wav_buffer, 'wb') as wav_file:
             wav_file.setnchannels(1)  # Mono
@@ -156,7 +282,6 @@ class AudioCapture:
             wav_file.setframerate(self.sample_rate)
             wav_file.writeframes(audio_data)
         
-        wav_buffer.seek(0)
         return wav_buffer.getvalue()
     
     def get_audio_level(self, audio_data: bytes) -> float:
@@ -164,8 +289,3 @@ class AudioCapture:
         audio_array = np.frombuffer(audio_data, dtype=np.int16)
         rms = np.sqrt(np.mean(audio_array**2))
         return float(rms)
-    
-    def __del__(self):
-        """Cleanup on destruction"""
-        if self.capturing:
-            asyncio.create_task(self.stop())
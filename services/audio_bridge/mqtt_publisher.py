@@ -7,8 +7,9 @@ Handles publishing transcript data to MQTT broker.
 import asyncio
 import json
 import logging
+import socket
 import time
-from typing import Optional
+from typing import Dict, Optional
 
 import paho.mqtt.client as mqtt
 
@@ -25,6 +26,8 @@ class MQTTPublisher:
         self.port = port
         self.house_id = house_id
         self.connected = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._connack: Optional[asyncio.Event] = None
         
         # MQTT client
         self.client = mqtt.Client()
@@ -38,10 +41,20 @@ class MQTTPublisher:
         """Callback for MQTT connection"""
         if reason_code == 0:
             self.connected = True
+            
+            # Feature and transcript packets are small; disable Nagle so they go out immediately
+            sock = client.socket()
+            if sock:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            
             logger.info("Connected to MQTT broker")
         else:
             self.connected = False
             logger.error(f"Failed to connect to MQTT broker: {reason_code}")
+        
+        # Wake connect(); paho calls this from its network thread
+        if self._connack is not None:
+            self._loop.call_soon_threadsafe(self._connack.set)
     
     def _on_disconnect(self, client, userdata, flags, reason_code, properties=None):
         """Callback for MQTT disconnection"""
@@ -60,6 +73,9 @@ class MQTTPublisher:
         try:
             # Connect in a separate thread to avoid blocking
             loop = asyncio.get_event_loop()
+            self._loop = loop
+            self._connack = asyncio.Event()
+            
             await loop.run_in_executor(
                 None,
                 lambda: self.client.connect(self.broker, self.port, 60)
@@ -71,11 +87,11 @@ class MQTTPublisher:
                 lambda: self.client.loop_start()
             )
             
-            # Wait for connection
-            for _ in range(30):  # 3 second timeout
-                if self.connected:
-                    break
-                await asyncio.sleep(0.1)
+            # Wait for the CONNACK to be signalled from paho's thread
+            try:
+                await asyncio.wait_for(self._connack.wait(), timeout=3.0)
+            except asyncio.TimeoutError:
+                pass
             
             if not self.connected:
                 raise Exception("Failed to connect to MQTT broker within timeout")
@@ -126,7 +142,7 @@ class MQTTPublisher:
                 "duration_ms": duration_ms,
                 "model": model,
                 "trigger": trigger,
-                "ts_ms": int(time.time() * 1000)
+                "ts_ms": time.time_ns() // 1_000_000
             }
             
             # Publish to topic
@@ -148,29 +164,20 @@ class MQTTPublisher:
         except Exception as e:
             logger.error(f"Error publishing transcript: {e}")
     
-    async def publish_audio_features(
-        self,
-        rms: float,
-        zcr: float,
-        low_freq: float,
-        mid_freq: float,
-        high_freq: float
-    ):
-        """Publish audio features to MQTT"""
+    async def publish_audio_features(self, features: Dict[str, float]):
+        """Publish one chunk's audio features (rms, zcr, low, mid, high) as a single message
+
+        Sent at QoS 0: features are telemetry superseded by the next chunk, so a
+        lost message is cheaper than a PUBACK round-trip and inflight tracking.
+        """
         if not self.connected:
             logger.warning("MQTT not connected, cannot publish audio features")
             return
         
         try:
             # Create audio features message
-            message = {
-                "rms": rms,
-                "zcr": zcr,
-                "low_freq": low_freq,
-                "mid_freq": mid_freq,
-                "high_freq": high_freq,
-                "ts_ms": int(time.time() * 1000)
-            }
+            message = dict(features)
+            message["ts_ms"] = time.time_ns() // 1_000_000
             
             # Publish to topic
             topic = f"party/{self.house_id}/macbook/audio/features"
@@ -180,7 +187,7 @@ class MQTTPublisher:
             loop = asyncio.get_event_loop()
             result = await loop.run_in_executor(
                 None,
-                lambda: self.client.publish(topic, payload, qos=1)
+                lambda: self.client.publish(topic, payload, qos=0)
             )
             
             if result.rc == mqtt.MQTT_ERR_SUCCESS:
@@ -192,7 +199,7 @@ class MQTTPublisher:
             logger.error(f"Error publishing audio features: {e}")
     
     async def publish_heartbeat(self):
-        """Publish heartbeat to MQTT"""
+        """Publish heartbeat to MQTT (QoS 0, the next heartbeat replaces a lost one)"""
         if not self.connected:
             return
         
@@ -200,7 +207,7 @@ class MQTTPublisher:
             message = {
                 "service": "audio_bridge",
                 "status": "running",
-                "ts_ms": int(time.time() * 1000)
+                "ts_ms": time.time_ns() // 1_000_000
             }
             
             topic = f"party/{self.house_id}/macbook/sys/heartbeat"
@@ -209,7 +216,7 @@ class MQTTPublisher:
             loop = asyncio.get_event_loop()
             await loop.run_in_executor(
                 None,
-                lambda: self.client.publish(topic, payload, qos=1)
+                lambda: self.client.publish(topic, payload, qos=0)
             )
             
         except Exception as e:
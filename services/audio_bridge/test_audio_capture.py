@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Audio Feature Tests
+
+Checks that analyze_chunk() reports levels in the same [0, 1] range as the node firmware.
+"""
+
+import numpy as np
+
+from audio_capture import FEATURE_NAMES, analyze_chunk
+
+SAMPLE_RATE = 16000
+
+
+def _int16_tone(freq_hz: float, seconds: float = 1.0) -> np.ndarray:
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    return np.round(32767 * np.sin(2 * np.pi * freq_hz * t)).astype(np.int16)
+
+
+def test_full_scale_sine_features_in_unit_range():
+    """A full-scale sine in each band keeps every feature within [0, 1]"""
+    for freq_hz in (100, 1000, 6000):
+        features = dict(zip(FEATURE_NAMES, analyze_chunk(_int16_tone(freq_hz), SAMPLE_RATE)))
+        for name, value in features.items():
+            assert 0.0 <= value <= 1.0, (freq_hz, name, value)
+        # A full-scale sine has RMS 1/sqrt(2), all of it in the tone's band
+        assert abs(features["rms"] - 2 ** -0.5) < 1e-3
+
+
+def test_extreme_signals_stay_in_unit_range():
+    """Full-scale DC and alternating extremes cannot push any feature above 1"""
+    n = SAMPLE_RATE // 10
+    dc = np.full(n, -32768, dtype=np.int16)
+    nyquist = np.where(np.arange(n) % 2, 32767, -32768).astype(np.int16)
+    for signal in (dc, nyquist):
+        for value in analyze_chunk(signal, SAMPLE_RATE):
+            assert 0.0 <= value <= 1.0 + 1e-6
+
+
+def test_empty_chunk():
+    """An empty buffer reports zero for every feature"""
+    assert analyze_chunk(np.array([], dtype=np.int16), SAMPLE_RATE) == (0.0,) * 5
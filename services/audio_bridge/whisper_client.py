@@ -4,9 +4,10 @@ Whisper Client Module
 Handles communication with faster-whisper service via Wyoming protocol.
 """
 
-import asyncio
+import io
 import logging
 import time
+import wave
 from typing import Optional
 
 import httpx
@@ -31,6 +32,9 @@ class WhisperClient:
             limits=httpx.Limits(max_connections=5)
         )
         
+        # Reusable buffer for WAV encoding
+        self._wav_buf = io.BytesIO()
+        
         logger.info(f"Whisper client initialized: {url}, model={model}, language={language}")
     
     async def test_connection(self) -> bool:
@@ -109,10 +113,9 @@ class WhisperClient:
     
     def _create_wav_data(self, audio_data: bytes) -> bytes:
         """Convert raw audio data to WAV format"""
-        import io
-        import wave
-        
-        wav_buffer = io.BytesIO()
+        wav_buffer = self._wav_buf
+        wav_buffer.seek(0)
+        wav_buffer.truncate(0)
         
         with wave.open(wav_buffer, 'wb') as wav_file:
             wav_file.setnchannels(1)  # Mono
@@ -120,7 +123,6 @@ class WhisperClient:
             wav_file.setframerate(16000)  # 16kHz
             wav_file.writeframes(audio_data)
         
-        wav_buffer.seek(0)
         return wav_buffer.getvalue()
     
     async def close(self):
@@ -128,8 +130,3 @@ class WhisperClient:
         await self.client.aclose()
         self.connected = False
         logger.info("Whisper client closed")
-    
-    def __del__(self):
-        """Cleanup on destruction"""
-        if self.connected:
-            asyncio.create_task(self.close())
@@ -14,13 +14,15 @@ import random
 import signal
 import sys
 import time
-from typing import Dict, List, Optional, Any
+from collections import OrderedDict
+from typing import Dict, Optional, Any, Tuple
 
+import orjson
 import paho.mqtt.client as mqtt
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from pydantic import BaseModel
 
-from llm_client import LLMClient
+from llm_client import LLMClient, close_http_clients
 from mqtt_subscriber import MQTTSubscriber
 from observation_generator import ObservationGenerator
 
@@ -41,6 +43,22 @@ OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
 ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY', '')
 OBSERVATION_INTERVAL_MIN = int(os.getenv('OBSERVATION_INTERVAL_MIN', '2'))
 OBSERVATION_INTERVAL_MAX = int(os.getenv('OBSERVATION_INTERVAL_MAX', '5'))
+SENSOR_FLUSH_INTERVAL = float(os.getenv('SENSOR_FLUSH_INTERVAL', '1.0'))
+MQTT_ACCEPT_MSGPACK = os.getenv('MQTT_ACCEPT_MSGPACK', 'false').lower() == 'true'
+
+# Reuse observations for unchanged sensor snapshots
+OBSERVATION_CACHE_SIZE = 32
+OBSERVATION_CACHE_TTL = 600.0  # seconds
+
+# msgpack sensor payloads (MQTT_ACCEPT_MSGPACK) may carry binary values and non-string keys
+SENSOR_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _sensor_json_default(value: Any) -> str:
+    """Encode values orjson has no JSON form for; bytes become hex"""
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    return repr(value)
 
 class HealthResponse(BaseModel):
     status: str
@@ -61,9 +79,16 @@ class LLMAgentService:
         self.mqtt_subscriber: Optional[MQTTSubscriber] = None
         self.observation_generator: Optional[ObservationGenerator] = None
         
-        # Sensor data cache
-        self.sensor_data: Dict[str, Any] = {}
-        self.last_observation_time = 0
+        # Sensor data cache, keyed by (node, domain, signal)
+        self.sensor_data: Dict[Tuple[str, str, str], Any] = {}
+        
+        # Latest value per key from the MQTT thread, moved into sensor_data by the flush loop
+        self._pending_updates: Dict[Tuple[str, str, str], Any] = {}
+        self._flush_interval = SENSOR_FLUSH_INTERVAL
+        
+        # Snapshot hash -> (monotonic time, observation)
+        self._obs_cache: "OrderedDict[int, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.last_observation_time: Optional[float] = None  # time.monotonic()
         
         # Setup FastAPI routes
         self.setup_routes()
@@ -89,7 +114,8 @@ class LLMAgentService:
         
         @self.app.get("/sensor-data")
         async def get_sensor_data():
-            return self.sensor_data
+            body = orjson.dumps(self.sensor_data_nested(), default=_sensor_json_default, option=SENSOR_JSON_OPTIONS)
+            return Response(body, media_type="application/json")
         
         @self.app.post("/generate-observation")
         async def generate_observation():
@@ -103,6 +129,13 @@ class LLMAgentService:
             else:
                 return {"error": "Failed to generate observation"}
     
+    def sensor_data_nested(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Rebuild the node -> domain -> signal view of the sensor cache"""
+        nested: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (node, domain, signal_name), payload in self.sensor_data.items():
+            nested.setdefault(node, {}).setdefault(domain, {})[signal_name] = payload
+        return nested
+    
     def signal_handler(self, signum, frame):
         logger.info(f"Received signal {signum}, shutting down...")
         self.running = False
@@ -126,7 +159,8 @@ class LLMAgentService:
                 broker=MQTT_BROKER,
                 port=MQTT_PORT,
                 house_id=HOUSE_ID,
-                on_message=self.handle_sensor_data
+                on_message=self.handle_sensor_data,
+                accept_msgpack=MQTT_ACCEPT_MSGPACK
             )
             await self.mqtt_subscriber.connect()
             
@@ -149,53 +183,98 @@ class LLMAgentService:
         try:
             # Extract node and domain from topic
             # Format: party/<house>/<node>/<domain>/<signal>
-            topic_parts = topic.split('/')
-            if len(topic_parts) >= 5:
-                node = topic_parts[2]
-                domain = topic_parts[3]
-                signal = topic_parts[4]
-                
-                # Update sensor data cache
-                if node not in self.sensor_data:
-                    self.sensor_data[node] = {}
-                if domain not in self.sensor_data[node]:
-                    self.sensor_data[node][domain] = {}
+            # Partition off each level instead of building a list; an empty
+            # signal means the topic had fewer than five levels
+            _, _, rest = topic.partition('/')
+            _, _, rest = rest.partition('/')
+            node, _, rest = rest.partition('/')
+            domain, _, signal_name = rest.partition('/')
+            if signal_name:
+                # Keep only the latest value until the next flush
+                self._pending_updates[(node, domain, signal_name)] = payload
                 
-                self.sensor_data[node][domain][signal] = payload
-                
-                logger.debug(f"Updated sensor data for {node}/{domain}/{signal}")
+                logger.debug("Updated sensor data for %s/%s/%s", node, domain, signal_name)
                 
         except Exception as e:
             logger.error(f"Error handling sensor data: {e}")
     
+    def flush_sensor_updates(self):
+        """Move pending sensor updates into the sensor data cache"""
+        pending = self._pending_updates
+        while pending:
+            key, payload = pending.popitem()
+            self.sensor_data[key] = payload
+    
+    async def sensor_flush_loop(self):
+        """Apply coalesced sensor updates once per flush interval"""
+        while self.running:
+            self.flush_sensor_updates()
+            await asyncio.sleep(self._flush_interval)
+    
+    def _snapshot_key(self) -> int:
+        """Hash the sensor snapshot, ignoring per-reading timestamps"""
+        items = [
+            (key, {k: v for k, v in payload.items() if k != 'ts_ms'} if isinstance(payload, dict) else payload)
+            for key, payload in sorted(self.sensor_data.items())
+        ]
+        return hash(orjson.dumps(items, default=_sensor_json_default, option=SENSOR_JSON_OPTIONS | orjson.OPT_SORT_KEYS))
+    
+    async def _observe(self) -> Optional[Dict[str, Any]]:
+        """Generate an observation, reusing a recent one if the snapshot is unchanged"""
+        key = self._snapshot_key()
+        now = time.monotonic()
+        
+        cached = self._obs_cache.get(key)
+        if cached and now - cached[0] < OBSERVATION_CACHE_TTL:
+            self._obs_cache.move_to_end(key)
+            logger.debug("Sensor snapshot unchanged, reusing cached observation")
+            return dict(cached[1])
+        
+        observation = await self.observation_generator.generate_observation(self.sensor_data)
+        if observation:
+            self._obs_cache[key] = (now, dict(observation))
+            self._obs_cache.move_to_end(key)
+            while len(self._obs_cache) > OBSERVATION_CACHE_SIZE:
+                self._obs_cache.popitem(last=False)
+        
+        return observation
+    
     async def observation_loop(self):
         """Main observation generation loop"""
         logger.info("Starting observation generation loop...")
         
         while self.running:
             try:
-                current_time = time.time()
+                # Nothing to observe yet
+                if not self.sensor_data:
+                    await asyncio.sleep(30)
+                    continue
                 
-                # Check if it's time for a new observation
-                time_since_last = current_time - self.last_observation_time
-                interval = random.randint(OBSERVATION_INTERVAL_MIN * 60, OBSERVATION_INTERVAL_MAX * 60)
+                # Sleep until the interval since the last observation has passed,
+                # in steps of at most 30 seconds so shutdown stays responsive
+                if self.last_observation_time is not None:
+                    interval = random.randint(OBSERVATION_INTERVAL_MIN * 60, OBSERVATION_INTERVAL_MAX * 60)
+                    deadline = self.last_observation_time + interval
+                    now = time.monotonic()
+                    while self.running and now < deadline:
+                        await asyncio.sleep(min(30, deadline - now))
+                        now = time.monotonic()
+                    if not self.running:
+                        break
                 
-                if time_since_last >= interval and self.sensor_data:
-                    # Generate observation
-                    observation = await self.observation_generator.generate_observation(self.sensor_data)
-                    
-                    if observation:
-                        # Publish observation to MQTT
-                        await self.mqtt_subscriber.publish_observation(observation)
-                        self.observations_generated += 1
-                        self.last_observation_time = current_time
-                        
-                        logger.info(f"Generated observation: {observation['text'][:100]}...")
-                    else:
-                        logger.warning("Failed to generate observation")
+                # Generate observation
+                observation = await self._observe()
                 
-                # Wait before next check
-                await asyncio.sleep(30)  # Check every 30 seconds
+                if observation:
+                    # Publish observation to MQTT
+                    await self.mqtt_subscriber.publish_observation(observation)
+                    self.observations_generated += 1
+                    self.last_observation_time = time.monotonic()
+                    
+                    logger.info(f"Generated observation: {observation['text'][:100]}...")
+                else:
+                    logger.warning("Failed to generate observation")
+                    await asyncio.sleep(30)  # Retry shortly
                 
             except Exception as e:
                 logger.error(f"Error in observation loop: {e}")
@@ -212,6 +291,7 @@ class LLMAgentService:
         
         # Start observation generation
         self.running = True
+        flush_task = asyncio.create_task(self.sensor_flush_loop())
         try:
             # Start observation loop
             await self.observation_loop()
@@ -219,6 +299,7 @@ class LLMAgentService:
         except Exception as e:
             logger.error(f"Error in main loop: {e}")
         finally:
+            flush_task.cancel()
             await self.cleanup()
     
     async def cleanup(self):
@@ -232,6 +313,9 @@ class LLMAgentService:
         if self.llm_client:
             await self.llm_client.close()
         
+        # Shared LLM HTTP pool outlives individual clients
+        await close_http_clients()
+        
         logger.info("Cleanup complete")
 
 async def main():
@@ -6,7 +6,9 @@ Handles communication with OpenAI and Anthropic APIs for generating observations
 
 import asyncio
 import logging
-from typing import Optional, Dict, Any
+import time
+from itertools import groupby
+from typing import Optional, Dict, Any, Tuple
 
 import httpx
 from openai import AsyncOpenAI
@@ -14,6 +16,82 @@ from anthropic import AsyncAnthropic
 
 logger = logging.getLogger(__name__)
 
+# Longest string value quoted in a prompt (e.g. a transcript)
+PROMPT_TEXT_LIMIT = 80
+
+
+# Coarse signal ages for prompts, so unchanged sensor state yields an identical prompt
+AGE_BUCKETS = (
+    (10, "just now"),
+    (60, "within the last minute"),
+    (300, "within the last few minutes"),
+)
+
+# Static parts of the observation prompt; the sensor summary goes between them
+OBSERVATION_PROMPT_HEAD = """You are an unreliable narrator observing a party through various sensors. Generate a brief, unsettling observation about what might be happening based on this sensor data:
+
+"""
+
+OBSERVATION_PROMPT_TAIL = """
+
+Generate a 1-2 sentence observation that is:
+- Vaguely unsettling or mysterious
+- Based on the sensor data but not literally describing it
+- Written in a detached, observational tone
+- Slightly ominous or foreboding
+- Appropriate for a party atmosphere
+
+Examples of good observations:
+- "The patterns suggest something is moving between rooms that shouldn't be there."
+- "The audio signatures don't match what should be happening at this hour."
+- "There's a rhythm to the activity that feels... intentional."
+
+Generate only the observation, no additional text:"""
+
+
+def _describe_age(age_seconds: float) -> str:
+    """Map a signal age to a coarse description"""
+    for limit, label in AGE_BUCKETS:
+        if age_seconds < limit:
+            return label
+    return "a while ago"
+
+
+def _describe_values(data: Dict[Any, Any]) -> str:
+    """Render a reading's scalar values, numbers at two significant figures, so the prompt follows the room"""
+    parts = []
+    for name, value in data.items():
+        if name == 'ts_ms':
+            continue
+        if isinstance(value, (bool, str)):
+            parts.append(f"{name}={str(value)[:PROMPT_TEXT_LIMIT]}")
+        elif isinstance(value, (int, float)):
+            parts.append(f"{name}={value:.2g}")
+    return ", ".join(parts)
+
+
+# Process-wide HTTP clients shared by every LLMClient, keyed by pool configuration
+_HTTP_CLIENTS: Dict[str, httpx.AsyncClient] = {}
+
+
+def _shared_http_client(key: str = "default") -> httpx.AsyncClient:
+    """Get the shared pooled HTTP/2 client, creating it on first use"""
+    client = _HTTP_CLIENTS.get(key)
+    if client is None or client.is_closed:
+        client = _HTTP_CLIENTS[key] = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=50),
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            http2=True
+        )
+    return client
+
+
+async def close_http_clients():
+    """Close the shared HTTP clients at process shutdown"""
+    while _HTTP_CLIENTS:
+        _, client = _HTTP_CLIENTS.popitem()
+        await client.aclose()
+
 class LLMClient:
     def __init__(
         self,
@@ -26,12 +104,13 @@ class LLMClient:
         self.model = model
         self.connected = False
         
+        
         # Initialize clients
         if self.provider == "openai" and openai_api_key:
-            self.openai_client = AsyncOpenAI(api_key=openai_api_key)
+            self.openai_client = AsyncOpenAI(api_key=openai_api_key, http_client=_shared_http_client())
             logger.info(f"OpenAI client initialized with model {model}")
         elif self.provider == "anthropic" and anthropic_api_key:
-            self.anthropic_client = AsyncAnthropic(api_key=anthropic_api_key)
+            self.anthropic_client = AsyncAnthropic(api_key=anthropic_api_key, http_client=_shared_http_client())
             logger.info(f"Anthropic client initialized with model {model}")
         else:
             logger.warning(f"No API key provided for {provider}")
@@ -105,7 +184,7 @@ class LLMClient:
             logger.error(f"Error generating text: {e}")
             return None
     
-    async def generate_observation(self, sensor_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    async def generate_observation(self, sensor_data: Dict[Tuple[str, str, str], Any]) -> Optional[Dict[str, Any]]:
         """Generate an unsettling observation from sensor data"""
         if not self.connected:
             return None
@@ -128,51 +207,39 @@ class LLMClient:
         
         return None
     
-    def _create_observation_prompt(self, sensor_data: Dict[str, Any]) -> str:
+    def _create_observation_prompt(self, sensor_data: Dict[Tuple[str, str, str], Any]) -> str:
         """Create a prompt for generating unsettling observations"""
-        
-        # Analyze sensor data
-        analysis = self._analyze_sensor_data(sensor_data)
-        
-        prompt = f"""You are an unreliable narrator observing a party through various sensors. Generate a brief, unsettling observation about what might be happening based on this sensor data:
-
-{analysis}
-
-Generate a 1-2 sentence observation that is:
-- Vaguely unsettling or mysterious
-- Based on the sensor data but not literally describing it
-- Written in a detached, observational tone
-- Slightly ominous or foreboding
-- Appropriate for a party atmosphere
-
-Examples of good observations:
-- "The patterns suggest something is moving between rooms that shouldn't be there."
-- "The audio signatures don't match what should be happening at this hour."
-- "There's a rhythm to the activity that feels... intentional."
-
-Generate only the observation, no additional text:"""
-        
-        return prompt
+        return OBSERVATION_PROMPT_HEAD + self._analyze_sensor_data(sensor_data) + OBSERVATION_PROMPT_TAIL
     
-    def _analyze_sensor_data(self, sensor_data: Dict[str, Any]) -> str:
+    def _analyze_sensor_data(self, sensor_data: Dict[Tuple[str, str, str], Any]) -> str:
         """Analyze sensor data and create a summary"""
         if not sensor_data:
             return "No sensor data available."
         
         analysis_parts = []
+        current_node = None
+        now_ms = time.time() * 1000  # ts_ms values are epoch milliseconds
         
-        for node, domains in sensor_data.items():
-            analysis_parts.append(f"Node {node}:")
+        # Sorted keys group signals by node, then domain
+        for (node, domain), group in groupby(sorted(sensor_data.items()), key=lambda item: item[0][:2]):
+            if node != current_node:
+                analysis_parts.append(f"Node {node}:")
+                current_node = node
+            
+            signals = list(group)
+            analysis_parts.append(f"  {domain}: {len(signals)} signals")
             
-            for domain, signals in domains.items():
-                if signals:
-                    analysis_parts.append(f"  {domain}: {len(signals)} signals")
-                    
-                    # Add some specific details
-                    for signal, data in signals.items():
-                        if isinstance(data, dict) and 'ts_ms' in data:
-                            age_seconds = (asyncio.get_event_loop().time() * 1000 - data['ts_ms']) / 1000
-                            analysis_parts.append(f"    {signal}: {age_seconds:.1f}s ago")
+            # Add the readings themselves and how fresh they are
+            for (_, _, signal), data in signals:
+                if not isinstance(data, dict):
+                    continue
+                details = [_describe_values(data)]
+                ts_ms = data.get('ts_ms')
+                if isinstance(ts_ms, (int, float)):
+                    details.append(f"({_describe_age((now_ms - ts_ms) / 1000)})")
+                detail = " ".join(part for part in details if part)
+                if detail:
+                    analysis_parts.append(f"    {signal}: {detail}")
         
         return "\n".join(analysis_parts) if analysis_parts else "No recent sensor activity."
     
@@ -5,11 +5,13 @@ Handles subscribing to sensor data and publishing observations.
 """
 
 import asyncio
-import json
 import logging
+import socket
 import time
 from typing import Callable, Dict, Any, Optional
 
+import msgpack
+import orjson
 import paho.mqtt.client as mqtt
 
 logger = logging.getLogger(__name__)
@@ -20,13 +22,21 @@ class MQTTSubscriber:
         broker: str = "localhost",
         port: int = 1883,
         house_id: str = "houseA",
-        on_message: Optional[Callable[[str, Dict[str, Any]], None]] = None
+        on_message: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        accept_msgpack: bool = False
     ):
         self.broker = broker
         self.port = port
         self.house_id = house_id
         self.on_message_callback = on_message
+        self.accept_msgpack = accept_msgpack
         self.connected = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._connack: Optional[asyncio.Event] = None
+        
+        # Publish topics are fixed for the life of the subscriber
+        self._obs_topic = f"party/{house_id}/llm_agent/observations/observation"
+        self._hb_topic = f"party/{house_id}/llm_agent/sys/heartbeat"
         
         # MQTT client
         import uuid
@@ -36,6 +46,10 @@ class MQTTSubscriber:
         self.client.on_disconnect = self._on_disconnect
         self.client.on_message = self._on_message
         self.client.on_publish = self._on_publish
+        
+        # Keep the QoS 1 pipeline full and bound the backlog while disconnected
+        self.client.max_inflight_messages_set(100)
+        self.client.max_queued_messages_set(1000)
         logger.info(f"MQTT client ID: {client_id}")
         
         logger.info(f"MQTT subscriber initialized: {broker}:{port}, house={house_id}")
@@ -44,6 +58,12 @@ class MQTTSubscriber:
         """Callback for MQTT connection"""
         if reason_code == 0:
             self.connected = True
+            
+            # Disable Nagle so observation and heartbeat packets are not held back
+            sock = client.socket()
+            if sock:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            
             logger.info("Connected to MQTT broker")
             
             # Subscribe to sensor data topics
@@ -54,6 +74,10 @@ class MQTTSubscriber:
         else:
             self.connected = False
             logger.error(f"Failed to connect to MQTT broker: {reason_code}")
+        
+        # Wake connect(); paho calls this from its network thread
+        if self._connack is not None:
+            self._loop.call_soon_threadsafe(self._connack.set)
     
     def _on_disconnect(self, client, userdata, flags, reason_code, properties=None):
         """Callback for MQTT disconnection"""
@@ -64,9 +88,10 @@ class MQTTSubscriber:
         """Callback for MQTT messages"""
         try:
             topic = msg.topic
-            payload = json.loads(msg.payload.decode('utf-8'))
+            payload = self._decode_payload(msg.payload)
             
-            logger.debug(f"Received message on {topic}: {payload}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Received message on %s: %s", topic, payload)
             
             # Call the message handler
             if self.on_message_callback:
@@ -75,10 +100,17 @@ class MQTTSubscriber:
         except Exception as e:
             logger.error(f"Error processing MQTT message: {e}")
     
+    def _decode_payload(self, raw: bytes) -> Any:
+        """Decode a sensor payload, accepting msgpack alongside JSON when enabled"""
+        # JSON text never starts with a byte >= 0x80; msgpack maps and arrays always do
+        if self.accept_msgpack and raw and raw[0] >= 0x80:
+            return msgpack.unpackb(raw, raw=False)
+        return orjson.loads(raw)
+    
     def _on_publish(self, client, userdata, mid, reason_code, properties=None):
         """Callback for MQTT publish"""
         if reason_code == 0:
-            logger.debug(f"Message published successfully (mid: {mid})")
+            logger.debug("Message published successfully (mid: %s)", mid)
         else:
             logger.error(f"Failed to publish message: {reason_code}")
     
@@ -87,6 +119,9 @@ class MQTTSubscriber:
         try:
             # Connect in a separate thread to avoid blocking
             loop = asyncio.get_event_loop()
+            self._loop = loop
+            self._connack = asyncio.Event()
+            
             await loop.run_in_executor(
                 None,
                 lambda: self.client.connect(self.broker, self.port, 60)
@@ -98,11 +133,11 @@ class MQTTSubscriber:
                 lambda: self.client.loop_start()
             )
             
-            # Wait for connection
-            for _ in range(30):  # 3 second timeout
-                if self.connected:
-                    break
-                await asyncio.sleep(0.1)
+            # Wait for the CONNACK to be signalled from paho's thread
+            try:
+                await asyncio.wait_for(self._connack.wait(), timeout=3.0)
+            except asyncio.TimeoutError:
+                pass
             
             if not self.connected:
                 raise Exception("Failed to connect to MQTT broker within timeout")
@@ -140,21 +175,15 @@ class MQTTSubscriber:
         
         try:
             # Add timestamp
-            observation["ts_ms"] = int(time.time() * 1000)
+            observation["ts_ms"] = time.time_ns() // 1_000_000
             
-            # Publish to topic
-            topic = f"party/{self.house_id}/llm_agent/observations/observation"
-            payload = json.dumps(observation)
+            payload = orjson.dumps(observation)
             
-            # Publish in executor to avoid blocking
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                lambda: self.client.publish(topic, payload, qos=1)
-            )
+            # paho's publish only queues the packet for its network thread, so call it directly
+            result = self.client.publish(self._obs_topic, payload, qos=1)
             
             if result.rc == mqtt.MQTT_ERR_SUCCESS:
-                logger.info(f"Published observation to {topic}")
+                logger.info(f"Published observation to {self._obs_topic}")
             else:
                 logger.error(f"Failed to publish observation: {result.rc}")
                 
@@ -170,17 +199,12 @@ class MQTTSubscriber:
             message = {
                 "service": "llm_agent",
                 "status": "running",
-                "ts_ms": int(time.time() * 1000)
+                "ts_ms": time.time_ns() // 1_000_000
             }
             
-            topic = f"party/{self.house_id}/llm_agent/sys/heartbeat"
-            payload = json.dumps(message)
+            payload = orjson.dumps(message)
             
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                lambda: self.client.publish(topic, payload, qos=1)
-            )
+            self.client.publish(self._hb_topic, payload, qos=1)
             
         except Exception as e:
             logger.error(f"Error publishing heartbeat: {e}")
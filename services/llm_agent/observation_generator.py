@@ -7,10 +7,18 @@ Generates unsettling observations from sensor data using LLM.
 import asyncio
 import logging
 import random
-from typing import Dict, Any, Optional, List
+import time
+from typing import Dict, Any, Optional, List, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Context flags, in priority order, and the lead-in each adds to a fallback template
+CONTEXT_PREFIXES = (
+    ('recent_activity', "The recent activity suggests "),
+    ('silence', "Despite the apparent silence, "),
+    ('multiple_nodes', "Across multiple sensors, "),
+)
+
 class ObservationGenerator:
     def __init__(
         self,
@@ -33,10 +41,12 @@ class ObservationGenerator:
             "The patterns indicate movement that doesn't match the expected flow.",
             "There's a disturbance in the usual data patterns."
         ]
+        self._lower_observations = tuple(t.lower() for t in self.fallback_observations)
+        self._rng = random.Random()
         
         logger.info("Observation generator initialized")
     
-    async def generate_observation(self, sensor_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    async def generate_observation(self, sensor_data: Dict[Tuple[str, str, str], Any]) -> Optional[Dict[str, Any]]:
         """Generate an unsettling observation from sensor data"""
         try:
             # Try to generate with LLM first
@@ -52,22 +62,21 @@ class ObservationGenerator:
             logger.error(f"Error generating observation: {e}")
             return None
     
-    async def _generate_fallback_observation(self, sensor_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def _generate_fallback_observation(self, sensor_data: Dict[Tuple[str, str, str], Any]) -> Dict[str, Any]:
         """Generate observation using fallback templates"""
         
         # Analyze sensor data for context
         context = self._analyze_sensor_context(sensor_data)
         
         # Select appropriate template
-        template = random.choice(self.fallback_observations)
+        index = self._rng.randrange(len(self.fallback_observations))
+        template = self.fallback_observations[index]
         
         # Add context-specific modifications
-        if context.get('recent_activity'):
-            template = f"The recent activity suggests {template.lower()}"
-        elif context.get('silence'):
-            template = f"Despite the apparent silence, {template.lower()}"
-        elif context.get('multiple_nodes'):
-            template = f"Across multiple sensors, {template.lower()}"
+        for key, prefix in CONTEXT_PREFIXES:
+            if context.get(key):
+                template = prefix + self._lower_observations[index]
+                break
         
         return {
             "text": template,
@@ -79,7 +88,7 @@ class ObservationGenerator:
             "context": context
         }
     
-    def _analyze_sensor_context(self, sensor_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _analyze_sensor_context(self, sensor_data: Dict[Tuple[str, str, str], Any]) -> Dict[str, Any]:
         """Analyze sensor data to provide context for observation generation"""
         context = {
             "recent_activity": False,
@@ -93,24 +102,22 @@ class ObservationGenerator:
         if not sensor_data:
             return context
         
-        current_time = asyncio.get_event_loop().time() * 1000
+        current_time = time.time() * 1000  # ts_ms values are epoch milliseconds
         recent_threshold = 30000  # 30 seconds
         
-        context["node_count"] = len(sensor_data)
+        context["node_count"] = len({node for node, _, _ in sensor_data})
         context["multiple_nodes"] = context["node_count"] > 1
+        context["domain_count"] = len({(node, domain) for node, domain, _ in sensor_data})
+        context["signal_count"] = len(sensor_data)
         
-        for node, domains in sensor_data.items():
-            context["domain_count"] += len(domains)
-            
-            for domain, signals in domains.items():
-                context["signal_count"] += len(signals)
-                
-                for signal, data in signals.items():
-                    if isinstance(data, dict) and 'ts_ms' in data:
-                        age_ms = current_time - data['ts_ms']
-                        if age_ms < recent_threshold:
-                            context["recent_activity"] = True
-                            context["silence"] = False
+        # One recent signal is enough, so stop at the first
+        for data in sensor_data.values():
+            if isinstance(data, dict):
+                ts_ms = data.get('ts_ms')
+                if ts_ms is not None and current_time - ts_ms < recent_threshold:
+                    context["recent_activity"] = True
+                    context["silence"] = False
+                    break
         
         return context
     
@@ -124,18 +131,14 @@ class ObservationGenerator:
             "What does this data pattern suggest that shouldn't be happening? Make it mysterious and disturbing."
         ]
     
-    async def generate_multiple_observations(self, sensor_data: Dict[str, Any], count: int = 3) -> List[Dict[str, Any]]:
+    async def generate_multiple_observations(self, sensor_data: Dict[Tuple[str, str, str], Any], count: int = 3) -> List[Dict[str, Any]]:
         """Generate multiple observations for variety"""
-        observations = []
-        
-        for _ in range(count):
-            observation = await self.generate_observation(sensor_data)
-            if observation:
-                observations.append(observation)
-                # Small delay to avoid rate limiting
-                await asyncio.sleep(0.1)
-        
-        return observations
+        # Requests are independent, so issue them concurrently
+        results = await asyncio.gather(
+            *(self.generate_observation(sensor_data) for _ in range(count)),
+            return_exceptions=True
+        )
+        return [result for result in results if isinstance(result, dict)]
     
     def get_observation_stats(self) -> Dict[str, Any]:
         """Get statistics about observation generation"""
@@ -5,13 +5,14 @@ Generates mock transcripts for testing the party UI
 """
 
 import asyncio
-import json
 import logging
 import os
 import random
+import socket
 import time
 from typing import Optional
 
+import orjson
 import paho.mqtt.client as mqtt
 from fastapi import FastAPI
 from pydantic import BaseModel
@@ -40,10 +41,14 @@ class MockAudioBridge:
         self.start_time = time.time()
         self.running = False
         self.transcripts_generated = 0
+        self._transcript_topic = f"party/{HOUSE_ID}/llm_agent/transcripts/transcript"
+        self._rng = random.Random()
         
         # MQTT client
         self.mqtt_client: Optional[mqtt.Client] = None
         self.connected = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._connack: Optional[asyncio.Event] = None
         
         # Mock transcripts
         self.mock_transcripts = [
@@ -98,16 +103,27 @@ class MockAudioBridge:
         self.mqtt_client.on_disconnect = self._on_disconnect
         self.mqtt_client.on_publish = self._on_publish
         self.mqtt_client.on_message = self._on_message # Added for completeness, though not used for mock
+        self.mqtt_client.max_inflight_messages_set(20)
         logger.info(f"MQTT client ID: {client_id}")
 
     def _on_connect(self, client, userdata, flags, reason_code, properties=None):
         """Callback for MQTT connection"""
         if reason_code == 0:
             self.connected = True
+            
+            # Disable Nagle so mock transcripts are sent without delay
+            sock = client.socket()
+            if sock:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            
             logger.info("Connected to MQTT broker")
         else:
             self.connected = False
             logger.error(f"Failed to connect to MQTT broker: {reason_code}")
+        
+        # Wake connect_mqtt(); paho calls this from its network thread
+        if self._connack is not None:
+            self._loop.call_soon_threadsafe(self._connack.set)
     
     def _on_disconnect(self, client, userdata, flags, reason_code, properties=None):
         """Callback for MQTT disconnection"""
@@ -117,13 +133,14 @@ class MockAudioBridge:
     def _on_publish(self, client, userdata, mid, reason_code, properties=None):
         """Callback for MQTT publish"""
         if reason_code == 0:
-            logger.debug(f"Message published successfully (mid: {mid})")
+            self.transcripts_generated += 1
+            logger.debug("Message published successfully (mid: %s)", mid)
         else:
             logger.error(f"Failed to publish message: {reason_code}")
     
     def _on_message(self, client, userdata, msg):
         """Callback for MQTT messages (not used for mock)"""
-        logger.debug(f"Received unexpected message on {msg.topic}")
+        logger.debug("Received unexpected message on %s", msg.topic)
     
     async def connect_mqtt(self):
         """Connect to MQTT broker"""
@@ -132,6 +149,9 @@ class MockAudioBridge:
             
             # Connect in executor to avoid blocking
             loop = asyncio.get_event_loop()
+            self._loop = loop
+            self._connack = asyncio.Event()
+            
             await loop.run_in_executor(
                 None,
                 lambda: self.mqtt_client.connect(MQTT_BROKER, MQTT_PORT, 60)
@@ -143,11 +163,11 @@ class MockAudioBridge:
                 lambda: self.mqtt_client.loop_start()
             )
             
-            # Wait for connection
-            for _ in range(30):  # 3 second timeout
-                if self.connected:
-                    break
-                await asyncio.sleep(0.1)
+            # Wait for the CONNACK to be signalled from paho's thread
+            try:
+                await asyncio.wait_for(self._connack.wait(), timeout=3.0)
+            except asyncio.TimeoutError:
+                pass
             
             if not self.connected:
                 raise Exception("Failed to connect to MQTT broker within timeout")
@@ -163,30 +183,24 @@ class MockAudioBridge:
             return
         
         try:
+            ts_ms = time.time_ns() // 1_000_000
             transcript = {
                 "text": text,
-                "confidence": random.uniform(0.7, 0.95),
-                "timestamp": int(time.time() * 1000),
+                "confidence": self._rng.uniform(0.7, 0.95),
+                "timestamp": ts_ms,
                 "source": "mock_audio_bridge",
-                "ts_ms": int(time.time() * 1000)
+                "ts_ms": ts_ms
             }
             
-            topic = f"party/{HOUSE_ID}/llm_agent/transcripts/transcript"
-            payload = json.dumps(transcript)
-            
-            # Publish in executor to avoid blocking
-            loop = asyncio.get_event_loop()
-            msg_info = await loop.run_in_executor(
-                None,
-                lambda: self.mqtt_client.publish(topic, payload, qos=0)
-            )
+            topic = self._transcript_topic
+            payload = orjson.dumps(transcript)
             
-            # Wait for the message to be published
-            await loop.run_in_executor(None, msg_info.wait_for_publish)
+            # paho's publish only queues the packet for its network thread, so call it directly
+            # Delivery is counted in _on_publish rather than waited for here
+            msg_info = self.mqtt_client.publish(topic, payload, qos=0)
             
-            if msg_info.is_published():
-                logger.info(f"Published transcript to {topic}: {text[:50]}...")
-                self.transcripts_generated += 1
+            if msg_info.rc == mqtt.MQTT_ERR_SUCCESS:
+                logger.info("Queued transcript for %s: %s...", topic, text[:50])
             else:
                 logger.error(f"Failed to publish transcript: {msg_info.rc}")
                 
@@ -200,10 +214,10 @@ class MockAudioBridge:
         while self.running:
             try:
                 # Generate a random transcript every 10-30 seconds
-                await asyncio.sleep(random.randint(10, 30))
+                await asyncio.sleep(self._rng.randint(10, 30))
                 
                 if self.connected:
-                    transcript = random.choice(self.mock_transcripts)
+                    transcript = self._rng.choice(self.mock_transcripts)
                     await self.publish_transcript(transcript)
                 
             except Exception as e:
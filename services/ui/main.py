@@ -1,20 +1,25 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import hashlib
 import os
+import sys
 import time
-from typing import Any
+from collections import deque
+from typing import Any, Callable
 
+import orjson
 import paho.mqtt.client as mqtt
-from fastapi import FastAPI, WebSocket
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, Request, WebSocket
+from fastapi.responses import HTMLResponse, Response
 from fastapi.staticfiles import StaticFiles
 
 HOUSE_ID = os.getenv("HOUSE_ID", "houseA")
 BROKER_HOST = os.getenv("BROKER_HOST", "mosquitto")
 BROKER_PORT = int(os.getenv("BROKER_PORT", "1883"))
 UI_PORT = int(os.getenv("UI_PORT", "8000"))
+# Each worker runs its own MQTT client, so the broker does the fan-out across workers
+UI_WORKERS = int(os.getenv("UI_WORKERS", "1"))
 
 TOPIC_BASE = f"party/{HOUSE_ID}"
 STATE_TOPIC = f"{TOPIC_BASE}/ui/state"
@@ -25,217 +30,327 @@ app = FastAPI()
 # Mount static files for JS modules
 app.mount("/js", StaticFiles(directory="static/js"), name="js")
 
+
+def _read_page(name: str) -> tuple[bytes, str]:
+    with open(f"static/{name}", "rb") as f:
+        body = f.read()
+    return body, f'"{hashlib.md5(body).hexdigest()}"'
+
+
+# Pages are baked into the image, so read them (and their ETags) once rather than on every request
+_PAGES: dict[str, tuple[bytes, str]] = {
+    name: _read_page(name)
+    for name in ("index.html", "debug.html", "debug-simple.html", "party.html")
+}
+
+
+def _page(request: Request, name: str) -> Response:
+    """Serve a cached page, answering 304 when the browser already has this version."""
+    body, etag = _PAGES[name]
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return HTMLResponse(body, headers={"ETag": etag})
+
 ui_state: dict[str, Any] = {
     "noise": {"rms": 0.0},
     "rooms": {},
     "buttons": {},
     "fabrication": {"level": 0.15},
 }
-_subscribers: set[WebSocket] = set()
-_debug_subscribers: set[WebSocket] = set()
-_party_subscribers: set[WebSocket] = set()
-_queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
-_debug_queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
-_party_queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+# The frame most recently broadcast on /ws, replayed as-is to newly connected clients
+_latest_payload: str = orjson.dumps(ui_state).decode()
+# ui_state as of the last broadcast, for working out which top-level keys changed
+_prev_state: dict[str, Any] = ui_state
+# Each websocket gets its own bounded outbound queue so a slow client only delays itself
+CLIENT_QUEUE_SIZE = 32
+_subscribers: dict[WebSocket, asyncio.Queue[str]] = {}
+_debug_subscribers: dict[WebSocket, asyncio.Queue[str]] = {}
+_party_subscribers: dict[WebSocket, asyncio.Queue[str]] = {}
+# /ws clients that sent {"subscribe": [...]} only get those top-level ui_state keys, and only when one changes
+_interests: dict[WebSocket, frozenset[str]] = {}
+# State updates overwrite ui_state and set this event; fanout sends the latest at most 30 times a second
+STATE_MAX_HZ = 30
+_state_ready = asyncio.Event()
+# Raw debug messages are sent as {"batch": [...]}, up to 64 per frame, gathered over 20 ms
+DEBUG_BATCH_SIZE = 64
+DEBUG_BATCH_WINDOW = 0.02
+# Bounds on the message buffers; when full the oldest message is dropped so memory stays flat under bursts
+MESSAGE_QUEUE_SIZE = 1024
+INBOX_SIZE = 4096
+_debug_queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=MESSAGE_QUEUE_SIZE)
+_party_queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=MESSAGE_QUEUE_SIZE)
 _loop: asyncio.AbstractEventLoop | None = None
+_mqtt_client: mqtt.Client | None = None
+# Paho's thread appends raw (topic, payload, timestamp) here and wakes the loop once per burst
+_inbox: deque[tuple[str, bytes, int]] = deque(maxlen=INBOX_SIZE)
+_inbox_ready = asyncio.Event()
+_drain_scheduled = False
+
+
+def _put_latest(queue: asyncio.Queue, item: Any) -> None:
+    """Put without blocking, dropping the oldest item when the queue is full."""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(item)
+
+
+def _broadcast(subscribers: dict[WebSocket, asyncio.Queue[str]], payload: str) -> None:
+    """Queue a frame for every subscriber, dropping its oldest frame when full."""
+    for queue in subscribers.values():
+        _put_latest(queue, payload)
+
+
+async def _serve_client(
+    ws: WebSocket,
+    subscribers: dict[WebSocket, asyncio.Queue[str]],
+    first: str | None = None,
+    on_text: Callable[[WebSocket, str], None] | None = None,
+) -> None:
+    """Feed one websocket from its own queue until the client disconnects, then unregister it."""
+    queue: asyncio.Queue[str] = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+    if first is not None:
+        queue.put_nowait(first)
+    subscribers[ws] = queue
+    writer = asyncio.create_task(_write_frames(ws, queue))
+    try:
+        # Waiting on the socket itself notices a close right away, with no timer per connection
+        while True:
+            message = await ws.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            text = message.get("text")
+            if text is not None and on_text is not None:
+                on_text(ws, text)  # binary frames are ignored
+    finally:
+        subscribers.pop(ws, None)
+        writer.cancel()
+
+
+async def _write_frames(ws: WebSocket, queue: asyncio.Queue[str]) -> None:
+    try:
+        while True:
+            await ws.send_text(await queue.get())
+    except Exception:
+        pass  # the reader in _serve_client sees the disconnect and cleans up
+
+
+def _set_interests(ws: WebSocket, text: str) -> None:
+    try:
+        message = orjson.loads(text)
+    except orjson.JSONDecodeError:
+        return
+    keys = message.get("subscribe") if isinstance(message, dict) else None
+    if isinstance(keys, list):
+        _interests[ws] = frozenset(map(str, keys))
+
+
+def _broadcast_state() -> None:
+    """Send the full state to plain /ws clients, and each subscribed client its whole slice when part of it changed."""
+    global _latest_payload, _prev_state
+    # Encode once per update, not once per subscriber; clients expect text frames
+    _latest_payload = orjson.dumps(ui_state).decode()
+    changed = {key for key in ui_state.keys() | _prev_state.keys() if ui_state.get(key) != _prev_state.get(key)}
+    _prev_state = ui_state
+    
+    frames: dict[frozenset[str], str] = {}
+    for ws, queue in _subscribers.items():
+        interests = _interests.get(ws)
+        if interests is None:
+            _put_latest(queue, _latest_payload)
+            continue
+        if interests.isdisjoint(changed):
+            continue
+        # Send every key the client asked for, not just the changed ones, so the newest
+        # frame is complete on its own and dropping older frames on overflow loses nothing
+        frame = frames.get(interests)
+        if frame is None:
+            frame = frames[interests] = orjson.dumps({key: ui_state.get(key) for key in interests}).decode()
+        _put_latest(queue, frame)
+
+
+def _set_state(state: dict[str, Any]) -> None:
+    global ui_state
+    ui_state = state
+    _state_ready.set()
+
+
+# Topics with a dedicated handler; everything else is raw traffic for the debug/party streams
+_ROUTES: dict[str, Callable[[Any], None]] = {
+    STATE_TOPIC: _set_state,
+}
 
 
 def on_connect(client, userdata, flags, reason_code, properties=None):
     print(f"[UI] on_connect called with reason_code: {reason_code}")
     if reason_code == 0:
         print(f"[UI] Connected to MQTT broker successfully")
-        print(f"[UI] Subscribing to {STATE_TOPIC}...")
-        result1 = client.subscribe(STATE_TOPIC, qos=1)
-        print(f"[UI] Subscribe result for {STATE_TOPIC}: {result1}")
+        # RAW_TOPIC already covers STATE_TOPIC; subscribing to both would deliver state twice
         print(f"[UI] Subscribing to {RAW_TOPIC}...")
-        result2 = client.subscribe(RAW_TOPIC, qos=1)
-        print(f"[UI] Subscribe result for {RAW_TOPIC}: {result2}")
-        print(f"[UI] Subscribed to topics: {STATE_TOPIC}, {RAW_TOPIC}")
+        result = client.subscribe(RAW_TOPIC, qos=1)
+        print(f"[UI] Subscribe result for {RAW_TOPIC}: {result}")
     else:
         print(f"[UI] Failed to connect to MQTT broker. Reason code: {reason_code}")
 
 
 def on_message(client, userdata, msg):
-    """Called in Paho's thread → schedule work onto the asyncio loop safely."""
+    """Called in Paho's thread → queue the raw message; parsing happens on the asyncio loop."""
+    global _drain_scheduled
+    print(f"[UI] Received MQTT message: {msg.topic}")
+    if msg.topic not in _ROUTES and not (_debug_subscribers or _party_subscribers):
+        return  # nobody is watching raw traffic
+    _inbox.append((msg.topic, msg.payload, time.time_ns() // 1_000_000))
+    if not _drain_scheduled:
+        _drain_scheduled = True
+        userdata["loop"].call_soon_threadsafe(_inbox_ready.set)
+
+
+def _route(topic: str, payload: bytes, timestamp: int) -> None:
     try:
-        print(f"[UI] Received MQTT message: {msg.topic}")
-        data = json.loads(msg.payload.decode("utf-8", "ignore"))
+        data = orjson.loads(payload)
     except Exception as e:
         print(f"[UI] Error parsing MQTT message: {e}")
         return
     
-    loop: asyncio.AbstractEventLoop = userdata["loop"]
-    queue: asyncio.Queue = userdata["queue"]
-    debug_queue: asyncio.Queue = userdata["debug_queue"]
-    party_queue: asyncio.Queue = userdata["party_queue"]
+    handler = _ROUTES.get(topic)
+    if handler is not None:
+        handler(data)
+        return
     
-    # Route messages based on topic
-    if msg.topic == STATE_TOPIC:
-        loop.call_soon_threadsafe(queue.put_nowait, data)
-    elif msg.topic.startswith("party/"):
-        # All party messages go to both debug and party queues
-        debug_data = {
-            "topic": msg.topic,
-            "payload": data,
-            "timestamp": userdata["timestamp"]()
-        }
-        loop.call_soon_threadsafe(debug_queue.put_nowait, debug_data)
-        
-        # Also send to party queue for real-time display
-        party_data = {
-            "topic": msg.topic,
-            "payload": data,
-            "timestamp": userdata["timestamp"]()
-        }
-        loop.call_soon_threadsafe(party_queue.put_nowait, party_data)
-    else:
-        # Raw MQTT message for debugging
-        debug_data = {
-            "topic": msg.topic,
-            "payload": data,
-            "timestamp": userdata["timestamp"]()
-        }
-        loop.call_soon_threadsafe(debug_queue.put_nowait, debug_data)
+    message = {"topic": topic, "payload": data, "timestamp": timestamp}
+    if _debug_subscribers:
+        _put_latest(_debug_queue, message)
+    if _party_subscribers and topic.startswith("party/"):
+        # Party messages also feed the real-time party display
+        _put_latest(_party_queue, message)
 
 
 @app.on_event("startup")
 async def startup():
-    global _loop
+    global _loop, _mqtt_client
     _loop = asyncio.get_running_loop()
 
-    # Start MQTT client in its own thread; pass loop/queue via userdata
-    def mqtt_thread():
-        import uuid
-        client_id = f"wm-ui-{uuid.uuid4().hex[:8]}"
-        
-        c = mqtt.Client(
-            mqtt.CallbackAPIVersion.VERSION2,
-            client_id=client_id,
-            userdata={
-                "loop": _loop, 
-                "queue": _queue, 
-                "debug_queue": _debug_queue,
-                "party_queue": _party_queue,
-                "timestamp": lambda: int(time.time() * 1000)
-            },
-        )
-        c.on_connect = on_connect
-        c.on_message = on_message
-        
-        print(f"[UI] Connecting to MQTT broker at {BROKER_HOST}:{BROKER_PORT} with client ID: {client_id}")
-        result = c.connect(BROKER_HOST, BROKER_PORT, 60)
-        print(f"[UI] MQTT connect result: {result}")
-        
-        if result == 0:
-            c.loop_forever()
-        else:
-            print(f"[UI] Failed to connect to MQTT broker")
-
-    import threading
-
-    threading.Thread(target=mqtt_thread, daemon=True).start()
+    import uuid
+    client_id = f"wm-ui-{uuid.uuid4().hex[:8]}"
+    
+    # paho's network thread calls on_message; pass the loop via userdata
+    c = mqtt.Client(
+        mqtt.CallbackAPIVersion.VERSION2,
+        client_id=client_id,
+        userdata={"loop": _loop},
+    )
+    c.on_connect = on_connect
+    c.on_message = on_message
+    
+    # connect_async + loop_start keeps retrying until the broker is reachable, so
+    # startup never blocks on it and a broker that comes up late is still picked up
+    print(f"[UI] Connecting to MQTT broker at {BROKER_HOST}:{BROKER_PORT} with client ID: {client_id}")
+    c.connect_async(BROKER_HOST, BROKER_PORT, 60)
+    c.loop_start()
+    _mqtt_client = c
+
+    async def drain_inbox():
+        global _drain_scheduled
+        while True:
+            await _inbox_ready.wait()
+            _inbox_ready.clear()
+            # Clear the flag before draining so a message appended mid-drain schedules another pass
+            _drain_scheduled = False
+            while _inbox:
+                _route(*_inbox.popleft())
 
     async def fanout():
-        global ui_state
         while True:
-            ui_state = await _queue.get()
-            dead = set()
-            for ws in list(_subscribers):
-                try:
-                    await ws.send_json(ui_state)
-                except Exception:
-                    dead.add(ws)
-            _subscribers.difference_update(dead)
+            await _state_ready.wait()
+            _state_ready.clear()
+            _broadcast_state()
+            await asyncio.sleep(1 / STATE_MAX_HZ)
 
     async def debug_fanout():
         while True:
-            debug_data = await _debug_queue.get()
-            dead = set()
-            for ws in list(_debug_subscribers):
+            batch = [await _debug_queue.get()]
+            await asyncio.sleep(DEBUG_BATCH_WINDOW)
+            while len(batch) < DEBUG_BATCH_SIZE:
                 try:
-                    await ws.send_json(debug_data)
-                except Exception:
-                    dead.add(ws)
-            _debug_subscribers.difference_update(dead)
+                    batch.append(_debug_queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            _broadcast(_debug_subscribers, orjson.dumps({"batch": batch}).decode())
 
     async def party_fanout():
         while True:
             party_data = await _party_queue.get()
-            dead = set()
-            for ws in list(_party_subscribers):
-                try:
-                    await ws.send_json(party_data)
-                except Exception:
-                    dead.add(ws)
-            _party_subscribers.difference_update(dead)
+            _broadcast(_party_subscribers, orjson.dumps(party_data).decode())
 
+    asyncio.create_task(drain_inbox())
     asyncio.create_task(fanout())
     asyncio.create_task(debug_fanout())
     asyncio.create_task(party_fanout())
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    if _mqtt_client is not None:
+        _mqtt_client.disconnect()
+        _mqtt_client.loop_stop()
+
+
 @app.get("/")
-def index():
-    with open("static/index.html", encoding="utf-8") as f:
-        return HTMLResponse(f.read())
+async def index(request: Request):
+    return _page(request, "index.html")
 
 
 @app.get("/debug")
-def debug():
+async def debug(request: Request):
     """Modular debug UI with real-time sensor monitoring and signal plotting."""
-    with open("static/debug.html", encoding="utf-8") as f:
-        return HTMLResponse(f.read())
+    return _page(request, "debug.html")
 
 
 @app.get("/debug-simple")
-def debug_simple():
+async def debug_simple(request: Request):
     """Simple debug UI without Chart.js (fallback for troubleshooting)."""
-    with open("static/debug-simple.html", encoding="utf-8") as f:
-        return HTMLResponse(f.read())
+    return _page(request, "debug-simple.html")
 
 
 @app.get("/party")
-def party():
+async def party(request: Request):
     """Touchscreen-optimized party interface with unreliable narrator aesthetic."""
-    with open("static/party.html", encoding="utf-8") as f:
-        return HTMLResponse(f.read())
+    return _page(request, "party.html")
 
 
 @app.websocket("/ws")
 async def ws_endpoint(ws: WebSocket):
     await ws.accept()
-    _subscribers.add(ws)
-    await ws.send_json(ui_state)
     try:
-        while True:
-            await asyncio.sleep(3600)
+        await _serve_client(ws, _subscribers, first=_latest_payload, on_text=_set_interests)
     finally:
-        _subscribers.discard(ws)
+        _interests.pop(ws, None)
 
 
 @app.websocket("/ws/debug")
 async def ws_debug_endpoint(ws: WebSocket):
     await ws.accept()
-    _debug_subscribers.add(ws)
-    try:
-        while True:
-            await asyncio.sleep(3600)
-    finally:
-        _debug_subscribers.discard(ws)
+    await _serve_client(ws, _debug_subscribers)
 
 
 @app.websocket("/ws/party")
 async def ws_party_endpoint(ws: WebSocket):
     await ws.accept()
-    _party_subscribers.add(ws)
-    try:
-        while True:
-            await asyncio.sleep(3600)
-    finally:
-        _party_subscribers.discard(ws)
+    await _serve_client(ws, _party_subscribers)
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run("main:app", host="0.0.0.0", port=UI_PORT, reload=False)
+    # uvloop ships with uvicorn[standard] everywhere but Windows; ask for it explicitly so a
+    # missing install fails loudly instead of silently falling back to the selector loop
+    loop = "asyncio" if sys.platform == "win32" else "uvloop"
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=UI_PORT,
+        reload=False,
+        loop=loop,
+        http="httptools",
+        ws="websockets",
+        workers=UI_WORKERS,
+    )
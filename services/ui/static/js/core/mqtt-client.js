@@ -37,7 +37,10 @@ export class MQTTClient {
             this.ws.onmessage = (event) => {
                 try {
                     const data = JSON.parse(event.data);
-                    this.routeMessage(data);
+                    // /ws/debug sends {batch: [...]}; other endpoints send single messages
+                    for (const message of data.batch ?? [data]) {
+                        this.routeMessage(message);
+                    }
                 } catch (error) {
                     console.error('[MQTT] Error parsing message:', error);
                 }
@@ -10,15 +10,48 @@ import asyncio
 import json
 import logging
 import os
+import shutil
+import signal
+import socket
 import subprocess
 import time
+from collections import Counter, deque
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, List, Optional, Any
+from typing import Deque, Dict, List, Optional, Any, Tuple
 from pathlib import Path
 
+import orjson
 import paho.mqtt.client as mqtt
 
+# Number of touch events kept in history
+TOUCH_HISTORY_SIZE = 100
+
+# Seconds between insight publishes when no touches arrive
+INTERACTION_HEARTBEAT_INTERVAL = 30.0
+
+# Minimum seconds between change-driven insight publishes
+INSIGHTS_MIN_INTERVAL = 1.0
+
+# Bump when the calibration file format or defaults change to force recalibration
+CALIBRATION_VERSION = 1
+
+# Upper bound on messages paho holds for the broker (0 would mean unlimited)
+MQTT_MAX_QUEUED_MESSAGES = 100
+
+# Seconds a detected display state is reused before detecting again
+DISPLAY_STATE_TTL = 5.0
+
+# Seconds to coalesce queued display messages into one batch publish
+PUBLISH_BATCH_INTERVAL = 0.1
+
+
+def _slide(window: Deque[bool], flag: bool) -> int:
+    """Append a flag to a bounded window and return the change in its True count"""
+    evicted = len(window) == window.maxlen and window[0]
+    window.append(flag)
+    return flag - evicted
+
 
 class DisplayState(Enum):
     """Display state enumeration"""
@@ -39,6 +72,15 @@ class TouchInteraction(Enum):
     MULTI_TOUCH = "multi_touch"
 
 
+# Interaction pattern keys and the touch type each one counts
+PATTERN_TYPES = (
+    ('rapid_taps', TouchInteraction.TAP),
+    ('long_presses', TouchInteraction.LONG_PRESS),
+    ('swipes', TouchInteraction.SWIPE),
+    ('multi_touch', TouchInteraction.MULTI_TOUCH),
+)
+
+
 @dataclass
 class WSL2DisplayConfig:
     """WSL2 display configuration"""
@@ -54,7 +96,7 @@ class WSL2DisplayConfig:
     windows_integration: bool = True
 
 
-@dataclass
+@dataclass(slots=True)
 class TouchEvent:
     """Touch event data"""
     event_type: TouchInteraction
@@ -73,10 +115,30 @@ class WSL2DisplayManager:
         self.config = config
         self.logger = logger or logging.getLogger(__name__)
         self.current_state = DisplayState.UNKNOWN
-        self.touch_history: List[TouchEvent] = []
+        self.touch_history: Deque[TouchEvent] = deque(maxlen=TOUCH_HISTORY_SIZE)
         self.interaction_patterns: Dict[str, int] = {}
         self.delight_triggers: Dict[str, Any] = {}
         self.mqtt_client: Optional[mqtt.Client] = None
+        self._touch_signal = asyncio.Event()
+        self._patterns_snapshot: Tuple[int, ...] = ()
+        self._egg_count = 0
+        self._last_insight_sig: Optional[int] = None
+        self._last_insight_ts = 0.0
+        self._insight_timer: Optional[asyncio.TimerHandle] = None
+        self._insight_task: Optional[asyncio.Task] = None
+        self._pub_queue: List[Tuple[str, Dict[str, Any]]] = []
+        self._pub_signal = asyncio.Event()
+        self._stats_cache: Optional[Dict[str, Any]] = None
+        self._stats_key: Optional[Tuple[DisplayState, int]] = None
+        self._stats_dirty = True
+        
+        # Rolling windows and streaks kept up to date by record_touch_event
+        self._type_window: Deque[TouchInteraction] = deque(maxlen=10)
+        self._type_counts: Counter = Counter()
+        self._corner_window: Deque[bool] = deque(maxlen=5)
+        self._corner_count = 0
+        self._long_press_streak = 0
+        self._multi_touch_streak = 0
         
         # Delightful interaction settings
         self.easter_eggs = {
@@ -94,23 +156,23 @@ class WSL2DisplayManager:
         # WSL2 specific settings
         self.wsl2_distro = os.getenv('WSL_DISTRO_NAME', 'unknown')
         self.windows_host = self._get_windows_hostname()
+        self._last_state_ts = 0.0
+        
+        # Resolve Windows interop once instead of per configuration call
+        self._powershell = shutil.which('powershell.exe')
     
     def _get_windows_hostname(self) -> str:
         """Get Windows hostname via WSL2 integration"""
         try:
-            # Try to access Windows hostname via WSL2 integration
-            # This should work from WSL2 but not from inside Docker container
-            result = subprocess.run([
-                'hostname'
-            ], capture_output=True, text=True, timeout=5)
-            return result.stdout.strip() if result.returncode == 0 else 'wsl2-host'
+            # WSL2 shares the Windows hostname; read it without spawning `hostname`
+            return socket.gethostname() or 'wsl2-host'
         except Exception:
             return 'wsl2-host'
     
     async def initialize(self) -> bool:
         """Initialize WSL2 display manager"""
         try:
-            self.logger.info(f"Initializing WSL2 Display Manager (Distro: {self.wsl2_distro})...")
+            self.logger.info("Initializing WSL2 Display Manager (Distro: %s)...", self.wsl2_distro)
             
             # Detect current display state via Windows
             await self._detect_wsl2_display_state()
@@ -123,27 +185,32 @@ class WSL2DisplayManager:
             
             if success:
                 self.logger.info("WSL2 Display Manager initialized successfully")
-                # Start interaction monitoring
+                # Start interaction monitoring and batched publishing
                 asyncio.create_task(self._monitor_interactions())
+                asyncio.create_task(self._publish_flusher())
                 return True
             else:
                 self.logger.error("Failed to initialize WSL2 Display Manager")
                 return False
                 
         except Exception as e:
-            self.logger.error(f"WSL2 Display Manager initialization failed: {e}")
+            self.logger.error("WSL2 Display Manager initialization failed: %s", e)
             return False
     
     async def _detect_wsl2_display_state(self):
         """Detect current Windows display configuration via WSL2"""
+        if time.time() - self._last_state_ts < DISPLAY_STATE_TTL:
+            return
+        
         try:
             # For WSL2 party mode, assume external display is available
             # The actual display configuration is handled by the Windows host
             self.logger.info("WSL2 party mode: assuming external display available")
             self.current_state = DisplayState.EXTERNAL_ONLY
+            self._last_state_ts = time.time()
                 
         except Exception as e:
-            self.logger.error(f"WSL2 display detection failed: {e}")
+            self.logger.error("WSL2 display detection failed: %s", e)
             self.current_state = DisplayState.WSL2_INTEGRATION
     
     async def _configure_wsl2_displays(self) -> bool:
@@ -158,25 +225,43 @@ class WSL2DisplayManager:
             return True
             
         except Exception as e:
-            self.logger.error(f"WSL2 display configuration failed: {e}")
+            self.logger.error("WSL2 display configuration failed: %s", e)
             return False
     
+    async def _run_powershell(self, script: str):
+        """Run a PowerShell command without blocking the event loop"""
+        cmd = [self._powershell, '-NoProfile', '-NonInteractive', '-Command', script]
+        proc = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE)
+        out, _ = await proc.communicate()
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd, output=out)
+        if out:
+            self.logger.debug(out.decode(errors='replace').strip())
+    
     async def _disable_wsl2_power_management(self):
         """Disable Windows screensaver and sleep via WSL2"""
+        if not self._powershell:
+            self.logger.warning("powershell.exe not available, skipping Windows power management")
+            return
+        
         try:
             if self.config.disable_screensaver:
                 # Use PowerShell via WSL2 to disable power management
-                subprocess.run([
-                    'powershell.exe', '-Command',
-                    'powercfg /change monitor-timeout-ac 0; powercfg /change standby-timeout-ac 0'
-                ], check=True)
+                await asyncio.gather(
+                    self._run_powershell('powercfg /change monitor-timeout-ac 0'),
+                    self._run_powershell('powercfg /change standby-timeout-ac 0')
+                )
                 
                 self.logger.info("Disabled Windows power management via WSL2")
         except subprocess.CalledProcessError as e:
-            self.logger.warning(f"Could not disable Windows power management via WSL2: {e}")
+            self.logger.warning("Could not disable Windows power management via WSL2: %s", e)
     
     async def _set_wsl2_primary_display(self):
         """Set external display as primary on Windows via WSL2"""
+        if not self._powershell:
+            self.logger.warning("powershell.exe not available, skipping Windows primary display")
+            return
+        
         try:
             # Use PowerShell via WSL2 to configure displays
             script = """
@@ -186,33 +271,31 @@ class WSL2DisplayManager:
             Write-Host "External display configuration applied"
             """
             
-            subprocess.run([
-                'powershell.exe', '-Command', script
-            ], check=True)
+            await self._run_powershell(script)
             
             self.logger.info("Set external display as primary on Windows via WSL2")
         except subprocess.CalledProcessError as e:
-            self.logger.warning(f"Could not set Windows primary display via WSL2: {e}")
+            self.logger.warning("Could not set Windows primary display via WSL2: %s", e)
     
     async def _configure_wsl2_display_settings(self):
         """Configure Windows display resolution and brightness via WSL2"""
+        if not self._powershell:
+            self.logger.warning("powershell.exe not available, skipping Windows display settings")
+            return
+        
         try:
-            # Use PowerShell via WSL2 to configure display settings
-            script = f"""
-            Write-Host "Configuring Windows display settings via WSL2..."
-            Write-Host "Resolution: {self.config.resolution}"
-            Write-Host "Brightness: {self.config.brightness}%"
-            Write-Host "WSL2 Integration: Active"
-            """
+            # Set brightness directly through WMI; resolution is applied by the Windows host
+            script = (
+                "(Get-CimInstance -Namespace root/WMI -ClassName WmiMonitorBrightnessMethods)"
+                f".WmiSetBrightness(1, {int(self.config.brightness)})"
+            )
             
-            subprocess.run([
-                'powershell.exe', '-Command', script
-            ], check=True)
+            await self._run_powershell(script)
             
-            self.logger.info(f"Configured Windows display settings via WSL2: {self.config.resolution}")
+            self.logger.info("Configured Windows display settings via WSL2: %s", self.config.resolution)
             
         except subprocess.CalledProcessError as e:
-            self.logger.warning(f"Could not configure Windows display settings via WSL2: {e}")
+            self.logger.warning("Could not configure Windows display settings via WSL2: %s", e)
     
     async def _calibrate_wsl2_touchscreen(self):
         """Calibrate Windows touchscreen if needed via WSL2"""
@@ -220,14 +303,23 @@ class WSL2DisplayManager:
             # Check if touchscreen calibration is needed
             calibration_file = Path.home() / '.whispering_machine' / 'wsl2_touch_calibration.json'
             
-            if not calibration_file.exists():
+            if not self._calibration_up_to_date(calibration_file):
                 self.logger.info("WSL2 touchscreen calibration needed")
                 await self._perform_wsl2_calibration()
             else:
                 self.logger.info("WSL2 touchscreen calibration found")
                 
         except Exception as e:
-            self.logger.warning(f"WSL2 touchscreen calibration failed: {e}")
+            self.logger.warning("WSL2 touchscreen calibration failed: %s", e)
+    
+    def _calibration_up_to_date(self, calibration_file: Path) -> bool:
+        """Check that a calibration file exists and was written by this calibration version"""
+        try:
+            with open(calibration_file, 'rb') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return data.get('version') == CALIBRATION_VERSION and data.get('resolution') == self.config.resolution
     
     async def _perform_wsl2_calibration(self):
         """Perform Windows touchscreen calibration via WSL2"""
@@ -238,6 +330,7 @@ class WSL2DisplayManager:
             
             # WSL2-specific calibration data
             calibration_data = {
+                'version': CALIBRATION_VERSION,
                 'calibrated': True,
                 'platform': 'wsl2',
                 'host_os': 'windows',
@@ -254,14 +347,17 @@ class WSL2DisplayManager:
                 'wsl2_integration': True
             }
             
+            # Write to a temp file and swap it in so a crash never leaves a partial file
             calib_file = calib_dir / 'wsl2_touch_calibration.json'
-            with open(calib_file, 'w') as f:
-                json.dump(calibration_data, f, indent=2)
+            tmp_file = calib_file.with_suffix('.tmp')
+            with open(tmp_file, 'w') as f:
+                json.dump(calibration_data, f)
+            os.replace(tmp_file, calib_file)
             
             self.logger.info("WSL2 touchscreen calibration completed")
             
         except Exception as e:
-            self.logger.error(f"WSL2 calibration failed: {e}")
+            self.logger.error("WSL2 calibration failed: %s", e)
     
     async def _setup_mqtt(self):
         """Setup MQTT client for interaction publishing"""
@@ -269,19 +365,38 @@ class WSL2DisplayManager:
             broker_host = os.getenv('MQTT_BROKER', 'localhost')
             broker_port = int(os.getenv('MQTT_PORT', '1883'))
             
+            # Topics are fixed for the lifetime of the client
+            house_id = os.getenv('HOUSE_ID', 'houseA')
+            self._topic_easter_egg = f"party/{house_id}/display/easter_egg/"
+            self._topic_insights = f"party/{house_id}/display/interactions/insights"
+            self._topic_batch = f"party/{house_id}/display/batch"
+            
             self.mqtt_client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+            # Display telemetry is best-effort: no inflight window, bounded backlog
+            self.mqtt_client.max_inflight_messages_set(1)
+            self.mqtt_client.max_queued_messages_set(MQTT_MAX_QUEUED_MESSAGES)
             self.mqtt_client.connect(broker_host, broker_port, 60)
             self.mqtt_client.loop_start()
             
             self.logger.info("MQTT client connected for WSL2 touch interactions")
             
         except Exception as e:
-            self.logger.error(f"MQTT setup failed: {e}")
+            self.logger.error("MQTT setup failed: %s", e)
     
     async def _monitor_interactions(self):
         """Monitor touch interactions for delightful experiences"""
         while True:
             try:
+                # Sleep until a touch arrives; time out periodically to keep insights fresh
+                try:
+                    await asyncio.wait_for(
+                        self._touch_signal.wait(), timeout=INTERACTION_HEARTBEAT_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    await self._publish_interaction_insights(force=True)
+                    continue
+                self._touch_signal.clear()
+                
                 # Analyze recent touch patterns
                 await self._analyze_interaction_patterns()
                 
@@ -291,10 +406,8 @@ class WSL2DisplayManager:
                 # Publish interaction insights
                 await self._publish_interaction_insights()
                 
-                await asyncio.sleep(1.0)
-                
             except Exception as e:
-                self.logger.error(f"Interaction monitoring error: {e}")
+                self.logger.error("Interaction monitoring error: %s", e)
                 await asyncio.sleep(5.0)
     
     async def _analyze_interaction_patterns(self):
@@ -302,87 +415,55 @@ class WSL2DisplayManager:
         if len(self.touch_history) < 2:
             return
         
-        recent_touches = self.touch_history[-10:]  # Last 10 touches
-        
-        # Detect patterns
-        patterns = {
-            'rapid_taps': 0,
-            'long_presses': 0,
-            'swipes': 0,
-            'multi_touch': 0
-        }
-        
-        for touch in recent_touches:
-            if touch.event_type == TouchInteraction.TAP:
-                patterns['rapid_taps'] += 1
-            elif touch.event_type == TouchInteraction.LONG_PRESS:
-                patterns['long_presses'] += 1
-            elif touch.event_type == TouchInteraction.SWIPE:
-                patterns['swipes'] += 1
-            elif touch.event_type == TouchInteraction.MULTI_TOUCH:
-                patterns['multi_touch'] += 1
+        # Pattern counts over the last 10 touches, maintained by record_touch_event
+        counts = self._type_counts
+        patterns = {key: counts[touch_type] for key, touch_type in PATTERN_TYPES}
         
-        # Store patterns for analysis
-        self.interaction_patterns.update(patterns)
+        # Store patterns for analysis; replaced rather than mutated so queued payloads can share it
+        if patterns != self.interaction_patterns:
+            self.interaction_patterns = patterns
+            self._patterns_snapshot = tuple(patterns.values())
+            self._stats_dirty = True
     
     async def _check_easter_eggs(self):
         """Check for easter egg triggers"""
         try:
+            eggs = self.easter_eggs
+            
             # Konami code detection
-            if self._detect_konami_code():
-                await self._trigger_konami_easter_egg()
+            if not eggs['konami_code'] and self._detect_konami_code():
+                await self._trigger_konami_code_easter_egg()
             
             # Secret tap pattern
-            if self._detect_secret_pattern():
+            if not eggs['secret_tap_pattern'] and self._detect_secret_pattern():
                 await self._trigger_secret_easter_egg()
             
             # Long press reveal
-            if self._detect_long_press_pattern():
+            if not eggs['long_press_reveal'] and self._detect_long_press_pattern():
                 await self._trigger_long_press_easter_egg()
             
             # Multi-touch magic
-            if self._detect_multi_touch_pattern():
+            if not eggs['multi_touch_magic'] and self._detect_multi_touch_pattern():
                 await self._trigger_multi_touch_easter_egg()
                 
         except Exception as e:
-            self.logger.error(f"Easter egg check failed: {e}")
+            self.logger.error("Easter egg check failed: %s", e)
     
     def _detect_konami_code(self) -> bool:
-        """Detect Konami code pattern"""
-        if len(self.touch_history) < 10:
-            return False
-        
-        recent = self.touch_history[-10:]
-        return len([t for t in recent if t.event_type == TouchInteraction.SWIPE]) >= 4
+        """Detect Konami code pattern (4+ swipes in the last 10 touches)"""
+        return len(self._type_window) == self._type_window.maxlen and self._type_counts[TouchInteraction.SWIPE] >= 4
     
     def _detect_secret_pattern(self) -> bool:
-        """Detect secret tap pattern"""
-        if len(self.touch_history) < 5:
-            return False
-        
-        recent = self.touch_history[-5:]
-        corner_taps = 0
-        for touch in recent:
-            if (touch.x < 50 or touch.x > 974) and (touch.y < 50 or touch.y > 550):
-                corner_taps += 1
-        
-        return corner_taps >= 4
+        """Detect secret tap pattern (4+ corner touches in the last 5)"""
+        return len(self._corner_window) == self._corner_window.maxlen and self._corner_count >= 4
     
     def _detect_long_press_pattern(self) -> bool:
-        """Detect long press pattern"""
-        if len(self.touch_history) < 3:
-            return False
-        
-        recent = self.touch_history[-3:]
-        return all(t.event_type == TouchInteraction.LONG_PRESS for t in recent)
+        """Detect long press pattern (last 3 touches were long presses)"""
+        return self._long_press_streak >= 3
     
     def _detect_multi_touch_pattern(self) -> bool:
-        """Detect multi-touch pattern"""
-        if len(self.touch_history) < 2:
-            return False
-        
-        recent = self.touch_history[-2:]
-        return all(t.event_type == TouchInteraction.MULTI_TOUCH for t in recent)
+        """Detect multi-touch pattern (last 2 touches were multi-touch)"""
+        return self._multi_touch_streak >= 2
     
     async def _trigger_konami_code_easter_egg(self):
         """Trigger Konami code easter egg"""
@@ -390,6 +471,8 @@ class WSL2DisplayManager:
             return
         
         self.easter_eggs['konami_code'] = True
+        self._egg_count += 1
+        self._stats_dirty = True
         self.logger.info("🎮 Konami code detected on WSL2! Triggering easter egg...")
         
         await self._publish_easter_egg('konami_code', {
@@ -406,6 +489,8 @@ class WSL2DisplayManager:
             return
         
         self.easter_eggs['secret_tap_pattern'] = True
+        self._egg_count += 1
+        self._stats_dirty = True
         self.logger.info("🔍 Secret pattern detected on WSL2! Revealing hidden features...")
         
         await self._publish_easter_egg('secret_pattern', {
@@ -422,6 +507,8 @@ class WSL2DisplayManager:
             return
         
         self.easter_eggs['long_press_reveal'] = True
+        self._egg_count += 1
+        self._stats_dirty = True
         self.logger.info("⏰ Long press pattern detected on WSL2! Showing debug info...")
         
         await self._publish_easter_egg('long_press_reveal', {
@@ -438,6 +525,8 @@ class WSL2DisplayManager:
             return
         
         self.easter_eggs['multi_touch_magic'] = True
+        self._egg_count += 1
+        self._stats_dirty = True
         self.logger.info("✨ Multi-touch magic detected on WSL2! Creating visual effects...")
         
         await self._publish_easter_egg('multi_touch_magic', {
@@ -454,7 +543,7 @@ class WSL2DisplayManager:
             return
         
         try:
-            topic = f"party/{os.getenv('HOUSE_ID', 'houseA')}/display/easter_egg/{egg_type}"
+            topic = self._topic_easter_egg + egg_type
             payload = {
                 'type': egg_type,
                 'data': data,
@@ -465,33 +554,91 @@ class WSL2DisplayManager:
                 'windows_host': self.windows_host
             }
             
-            self.mqtt_client.publish(topic, json.dumps(payload))
-            self.logger.info(f"Published WSL2 easter egg: {egg_type}")
+            self._queue_publish(topic, payload)
+            self.logger.info("Queued WSL2 easter egg: %s", egg_type)
             
         except Exception as e:
-            self.logger.error(f"Failed to publish WSL2 easter egg: {e}")
+            self.logger.error("Failed to publish WSL2 easter egg: %s", e)
     
-    async def _publish_interaction_insights(self):
-        """Publish interaction insights to MQTT"""
+    async def _publish_interaction_insights(self, force: bool = False):
+        """Publish interaction insights to MQTT when they changed (or when forced)"""
         if not self.mqtt_client or not self.interaction_patterns:
             return
         
+        # Skip unchanged insights and rate-limit bursts of changes
+        now = time.time()
+        sig = hash((self._patterns_snapshot, len(self.touch_history), self._egg_count))
+        if not force:
+            if sig == self._last_insight_sig:
+                return
+            wait = INSIGHTS_MIN_INTERVAL - (now - self._last_insight_ts)
+            if wait > 0:
+                # Defer rather than drop, so the end of a touch burst is still published
+                if self._insight_timer is None:
+                    self._insight_timer = asyncio.get_running_loop().call_later(
+                        wait, self._publish_trailing_insights
+                    )
+                return
+        if self._insight_timer is not None:
+            self._insight_timer.cancel()
+            self._insight_timer = None
+        self._last_insight_sig = sig
+        self._last_insight_ts = now
+        
         try:
-            topic = f"party/{os.getenv('HOUSE_ID', 'houseA')}/display/interactions/insights"
+            topic = self._topic_insights
             payload = {
-                'patterns': self.interaction_patterns.copy(),
+                'patterns': self.interaction_patterns,
                 'total_interactions': len(self.touch_history),
-                'easter_eggs_found': sum(self.easter_eggs.values()),
-                'timestamp': time.time(),
+                'easter_eggs_found': self._egg_count,
+                'timestamp': now,
                 'platform': 'wsl2',
                 'wsl2_distro': self.wsl2_distro,
                 'windows_host': self.windows_host
             }
             
-            self.mqtt_client.publish(topic, json.dumps(payload))
+            self._queue_publish(topic, payload)
             
         except Exception as e:
-            self.logger.error(f"Failed to publish WSL2 interaction insights: {e}")
+            self.logger.error("Failed to publish WSL2 interaction insights: %s", e)
+    
+    def _publish_trailing_insights(self):
+        """Publish insights deferred by the rate limit, reading the state as it is now"""
+        self._insight_timer = None
+        self._insight_task = asyncio.create_task(self._publish_interaction_insights())
+        self._insight_task.add_done_callback(self._clear_insight_task)
+    
+    def _clear_insight_task(self, task: asyncio.Task):
+        """Forget the trailing insights task once it has finished"""
+        if self._insight_task is task:
+            self._insight_task = None
+    
+    def _queue_publish(self, topic: str, payload: Dict[str, Any]):
+        """Queue a message for the next batch publish"""
+        self._pub_queue.append((topic, payload))
+        self._pub_signal.set()
+    
+    def _flush_publish_queue(self):
+        """Publish all queued messages as a single batch message"""
+        if not self._pub_queue or not self.mqtt_client:
+            return
+        
+        batch, self._pub_queue = self._pub_queue, []
+        payload = {'batch': [{'topic': topic, 'payload': data} for topic, data in batch]}
+        self.mqtt_client.publish(self._topic_batch, orjson.dumps(payload), qos=0)
+        self.logger.debug("Published batch of %s WSL2 display messages", len(batch))
+    
+    async def _publish_flusher(self):
+        """Coalesce queued display messages into one MQTT publish per window"""
+        while True:
+            try:
+                await self._pub_signal.wait()
+                await asyncio.sleep(PUBLISH_BATCH_INTERVAL)
+                self._pub_signal.clear()
+                self._flush_publish_queue()
+                
+            except Exception as e:
+                self.logger.error("Failed to publish WSL2 display batch: %s", e)
     
     async def _attempt_recovery(self) -> bool:
         """Attempt to recover from configuration failures"""
@@ -500,7 +647,7 @@ class WSL2DisplayManager:
             return False
         
         self.recovery_attempts += 1
-        self.logger.info(f"Attempting WSL2 recovery #{self.recovery_attempts}")
+        self.logger.info("Attempting WSL2 recovery #%s", self.recovery_attempts)
         
         try:
             # Try simpler configuration via WSL2
@@ -512,41 +659,72 @@ class WSL2DisplayManager:
             return True
             
         except Exception as e:
-            self.logger.error(f"WSL2 recovery attempt {self.recovery_attempts} failed: {e}")
+            self.logger.error("WSL2 recovery attempt %s failed: %s", self.recovery_attempts, e)
             return False
     
     def record_touch_event(self, event: TouchEvent):
         """Record a touch event"""
+        # Bounded deque drops the oldest event once history is full
         self.touch_history.append(event)
         
-        # Keep only recent history (last 100 events)
-        if len(self.touch_history) > 100:
-            self.touch_history = self.touch_history[-100:]
+        # Update detector state incrementally instead of rescanning history
+        event_type = event.event_type
+        window = self._type_window
+        if len(window) == window.maxlen:
+            self._type_counts[window[0]] -= 1
+        window.append(event_type)
+        self._type_counts[event_type] += 1
+        is_corner = (event.x < 50 or event.x > 974) and (event.y < 50 or event.y > 550)
+        self._corner_count += _slide(self._corner_window, is_corner)
+        self._long_press_streak = self._long_press_streak + 1 if event_type == TouchInteraction.LONG_PRESS else 0
+        self._multi_touch_streak = self._multi_touch_streak + 1 if event_type == TouchInteraction.MULTI_TOUCH else 0
+        
+        # Wake the interaction monitor
+        self._stats_dirty = True
+        self._touch_signal.set()
     
     def get_interaction_stats(self) -> Dict[str, Any]:
-        """Get interaction statistics"""
-        return {
-            'total_interactions': len(self.touch_history),
-            'patterns': self.interaction_patterns.copy(),
-            'easter_eggs': self.easter_eggs.copy(),
-            'current_state': self.current_state.value,
-            'recovery_attempts': self.recovery_attempts,
-            'platform': 'wsl2',
-            'wsl2_distro': self.wsl2_distro,
-            'windows_host': self.windows_host
-        }
+        """Get interaction statistics, rebuilt only after touches, pattern or state changes"""
+        key = (self.current_state, self.recovery_attempts)
+        if self._stats_dirty or key != self._stats_key:
+            self._stats_cache = {
+                'total_interactions': len(self.touch_history),
+                'patterns': self.interaction_patterns.copy(),
+                'easter_eggs': self.easter_eggs.copy(),
+                'current_state': self.current_state.value,
+                'recovery_attempts': self.recovery_attempts,
+                'platform': 'wsl2',
+                'wsl2_distro': self.wsl2_distro,
+                'windows_host': self.windows_host
+            }
+            self._stats_key = key
+            self._stats_dirty = False
+        # Hand out copies so a caller mutating the result cannot corrupt the cache
+        stats = self._stats_cache.copy()
+        stats['patterns'] = stats['patterns'].copy()
+        stats['easter_eggs'] = stats['easter_eggs'].copy()
+        return stats
     
     async def cleanup(self):
         """Cleanup WSL2 display manager"""
         try:
+            # Drop any deferred insights publish before tearing down MQTT
+            if self._insight_timer is not None:
+                self._insight_timer.cancel()
+                self._insight_timer = None
+            if self._insight_task is not None:
+                self._insight_task.cancel()
+                self._insight_task = None
+            
             if self.mqtt_client:
+                self._flush_publish_queue()
                 self.mqtt_client.loop_stop()
                 self.mqtt_client.disconnect()
             
             self.logger.info("WSL2 Display Manager cleaned up")
             
         except Exception as e:
-            self.logger.error(f"WSL2 cleanup failed: {e}")
+            self.logger.error("WSL2 cleanup failed: %s", e)
 
 
 class WSL2PartyModeManager:
@@ -562,7 +740,7 @@ class WSL2PartyModeManager:
     async def start_party_mode(self) -> bool:
         """Start WSL2 party mode with all optimizations"""
         try:
-            self.logger.info(f"🎉 Starting WSL2 Party Mode (Distro: {self.wsl2_distro})...")
+            self.logger.info("🎉 Starting WSL2 Party Mode (Distro: %s)...", self.wsl2_distro)
             
             # Create WSL2 display configuration
             config = WSL2DisplayConfig()
@@ -584,7 +762,7 @@ class WSL2PartyModeManager:
                 return False
                 
         except Exception as e:
-            self.logger.error(f"WSL2 Party Mode startup failed: {e}")
+            self.logger.error("WSL2 Party Mode startup failed: %s", e)
             return False
     
     async def stop_party_mode(self):
@@ -603,7 +781,7 @@ class WSL2PartyModeManager:
             self.logger.info("WSL2 Party Mode stopped")
             
         except Exception as e:
-            self.logger.error(f"WSL2 Party Mode stop failed: {e}")
+            self.logger.error("WSL2 Party Mode stop failed: %s", e)
     
     async def _publish_party_mode_status(self, active: bool):
         """Publish WSL2 party mode status to MQTT"""
@@ -641,9 +819,17 @@ async def main():
         if success:
             logger.info("WSL2 Party Mode running... Press Ctrl+C to stop")
             
-            # Keep running
-            while True:
-                await asyncio.sleep(1.0)
+            # Sleep until asked to stop instead of waking every second
+            stop = asyncio.Event()
+            loop = asyncio.get_running_loop()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                try:
+                    loop.add_signal_handler(sig, stop.set)
+                except NotImplementedError:
+                    # Windows event loops lack signal handlers; Ctrl+C raises KeyboardInterrupt
+                    pass
+            await stop.wait()
+            logger.info("Shutting down WSL2 Party Mode...")
         else:
             logger.error("Failed to start WSL2 Party Mode")
             